@@ -1,36 +1,81 @@
+import sqlite3
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from app.config import Config
+from app.cache import response_cache, video_cache
+from app.json_provider import OrjsonProvider
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 
 
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores FOREIGN KEY constraints unless enabled per connection"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
 def create_app(config_class=Config):
     """Application factory pattern"""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
 
     # CORS(app, origins=["http://localhost:3000"])
     CORS(app, origins="*")
 
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Batch mode lets SQLite migrations alter constraints by rebuilding the table
+    migrate.init_app(app, db, render_as_batch=True)
     jwt.init_app(app)
+    response_cache.init_app(app)
+    video_cache.init_app(app)
+
+    with app.app_context():
+        # Dialects without statement cache support silently recompile every query
+        dialect = db.engine.dialect
+        if dialect.supports_statement_cache:
+            app.logger.info('SQLAlchemy statement cache enabled for dialect %s', dialect.name)
+        else:
+            app.logger.warning('Dialect %s does not support the SQLAlchemy statement cache', dialect.name)
+
+    from app.services import TokenService, UserService
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return TokenService.is_token_revoked(jwt_payload['jti'])
+
+    @jwt.user_lookup_loader
+    def load_user_from_token(jwt_header, jwt_data):
+        # Served from the short-lived primary-key cache, so most requests skip the SELECT
+        return UserService.get_user_by_id_cached(int(jwt_data['sub']))
     
     # Import blueprint and setup authentication middleware
     from app.routes import api_bp
     from app.middleware.auth import setup_auth_middleware
 
-    setup_auth_middleware(api_bp, exempt_routes=['/login', '/logout', '/users'])
+    setup_auth_middleware(api_bp, exempt_endpoints=['login', 'logout', 'create_user'])
     
     # Register blueprints
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Register JSON error handlers
+    from app.errors import register_error_handlers
+    register_error_handlers(app)
+    
+    # Log slow queries where query recording is enabled (development by default)
+    from app.query_counter import register_slow_query_logging
+    register_slow_query_logging(app)
+    
     return app
 
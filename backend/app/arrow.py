@@ -0,0 +1,43 @@
+import io
+from typing import Iterable, Optional, Sequence
+import pyarrow as pa
+from flask import Response, request
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def wants_arrow() -> bool:
+    """
+    Check whether the client prefers an Arrow IPC stream over JSON
+    
+    JSON is listed first so that wildcard or missing Accept headers keep getting JSON.
+    
+    Returns:
+        bool: True if Arrow is the best Accept match
+    """
+    best = request.accept_mimetypes.best_match(['application/json', ARROW_STREAM_MIMETYPE])
+    return best == ARROW_STREAM_MIMETYPE
+
+
+def arrow_response(
+    names: Sequence[str],
+    rows: Iterable[tuple],
+    headers: Optional[dict] = None
+) -> Response:
+    """
+    Encode rows column-major as a single-batch Arrow IPC stream
+    
+    Args:
+        names: Column names, in the same order as the values of each row
+        rows: Row tuples to transpose into columns
+        headers: Optional extra response headers
+        
+    Returns:
+        Response: The Arrow stream with the Arrow stream mimetype
+    """
+    columns = list(zip(*rows)) or [()] * len(names)
+    batch = pa.record_batch([pa.array(column) for column in columns], names=list(names))
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return Response(sink.getvalue(), status=200, headers=headers, mimetype=ARROW_STREAM_MIMETYPE)
@@ -0,0 +1,275 @@
+import threading
+import time
+from typing import Callable, Optional
+import orjson
+from cachetools import TTLCache
+from app.json_provider import ORJSON_OPTIONS
+
+try:
+    # Optional: share cached responses between workers when REDIS_URL is configured
+    import redis
+except ImportError:
+    redis = None
+
+
+class ResponseCache:
+    """
+    Read-through cache of encoded response bodies, grouped into namespaces.
+
+    Each namespace carries a version number that is part of every key, so a
+    whole namespace is invalidated in O(1) by bumping the version; stale entries
+    are never read again and simply expire. Backed by Redis when REDIS_URL is set
+    and the redis package is installed. Redis is optional: if it can't be reached,
+    reads are treated as misses and writes are skipped, so requests fall through
+    to the database instead of failing.
+
+    Without Redis, invalidations only reach the current process, so other workers
+    would keep serving bodies from before a write. Entries are then kept in a
+    per-process TTLCache for local_ttl seconds only, and not at all when local_ttl
+    is 0 (the default): every get() misses and set() is a no-op.
+    """
+
+    # Config keys holding the entry TTL with Redis and without it, in seconds
+    ttl_config_key = 'RESPONSE_CACHE_TTL'
+    local_ttl_config_key = 'RESPONSE_CACHE_LOCAL_TTL'
+    # Seconds to wait on Redis before giving up on the cache for that call
+    redis_timeout = 0.5
+
+    def __init__(self, ttl: int = 30, local_ttl: int = 0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.maxsize = maxsize
+        self._redis = None
+        self._entries = None
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def init_app(self, app):
+        """
+        Configure the backend from the app config
+
+        Args:
+            app: The Flask application
+        """
+        self.ttl = app.config.get(self.ttl_config_key, self.ttl)
+        self.local_ttl = app.config.get(self.local_ttl_config_key, self.local_ttl)
+        self._logger = app.logger
+        url = app.config.get('REDIS_URL')
+        if url and redis is not None:
+            self._redis = redis.Redis.from_url(
+                url,
+                socket_timeout=self.redis_timeout,
+                socket_connect_timeout=self.redis_timeout
+            )
+        else:
+            self._redis = None
+        if self._redis is None and self.local_ttl > 0:
+            self._entries = TTLCache(maxsize=self.maxsize, ttl=self.local_ttl)
+        else:
+            self._entries = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are stored at all"""
+        return self._redis is not None or self._entries is not None
+
+    def _call_redis(self, command: str, *args, default=None, **kwargs):
+        """Run a Redis command, returning default if Redis is unavailable"""
+        try:
+            return getattr(self._redis, command)(*args, **kwargs)
+        except redis.RedisError as e:
+            self._logger.warning('Redis %s failed, bypassing the cache: %s', command, e)
+            return default
+
+    def _version(self, namespace: str) -> int:
+        if self._redis is not None:
+            return int(self._call_redis('get', f'{namespace}:version') or 0)
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def key(self, namespace: str, key: str) -> str:
+        """
+        Build the full cache key for an entry under the namespace's current version
+
+        Build the key once per request and use it for both get() and set(), so a
+        body computed while the namespace was invalidated is stored under the
+        old version and never served.
+
+        Args:
+            namespace: The group the entry belongs to (e.g. 'videos')
+            key: The entry key within the namespace, built from the request parameters
+
+        Returns:
+            str: The versioned cache key
+        """
+        return f'{namespace}:{self._version(namespace)}:{key}'
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached body
+
+        Args:
+            key: The versioned key from key()
+
+        Returns:
+            bytes: The cached body, or None on a miss or when the cache is disabled
+        """
+        if self._redis is not None:
+            return self._call_redis('get', key)
+        if self._entries is None:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Cache a body for the configured TTL
+
+        Args:
+            key: The versioned key from key()
+            value: The encoded body
+        """
+        if self._redis is not None:
+            self._call_redis('setex', key, self.ttl, value)
+            return
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries[key] = value
+
+    def invalidate(self, *namespaces: str) -> None:
+        """
+        Invalidate every entry in the given namespaces
+
+        Args:
+            *namespaces: The namespaces to invalidate
+        """
+        for namespace in namespaces:
+            if self._redis is not None:
+                self._call_redis('incr', f'{namespace}:version')
+                continue
+            with self._lock:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+
+class VideoCache(ResponseCache):
+    """
+    Read-through cache of serialized videos, stored as orjson-encoded dicts.
+
+    With Redis, entries live for VIDEO_CACHE_TTL and concurrent misses on the same
+    key are collapsed behind a short SET NX lock, so only one worker queries the
+    database. Without Redis, entries live for VIDEO_CACHE_LOCAL_TTL, since other
+    worker processes never see this process's invalidations.
+
+    Keys aren't versioned: writes delete the affected videos' keys with delete(),
+    which leaves a short-lived tombstone so a load that read the row before the write
+    can't store it afterwards (entries are only set while the key is empty).
+    """
+    ttl_config_key = 'VIDEO_CACHE_TTL'
+    local_ttl_config_key = 'VIDEO_CACHE_LOCAL_TTL'
+    # How long a loader may hold the lock, and how long others wait on it
+    lock_ttl = 5
+    lock_wait = 0.5
+    lock_poll_interval = 0.05
+    # Stored in place of deleted entries for lock_ttl seconds; encoded dicts are never empty
+    tombstone = b''
+
+    def __init__(self, ttl: int = 3600, local_ttl: int = 5, maxsize: int = 4096):
+        super().__init__(ttl=ttl, local_ttl=local_ttl, maxsize=maxsize)
+
+    def key(self, namespace: str, key: str) -> str:
+        """
+        Build the full cache key for an entry
+
+        Args:
+            namespace: The group the entry belongs to (e.g. 'video')
+            key: The entry key within the namespace
+
+        Returns:
+            str: The cache key
+        """
+        return f'{namespace}:{key}'
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Cache an encoded dict, unless the key already holds an entry or a tombstone
+
+        Args:
+            key: The key from key()
+            value: The encoded dict
+        """
+        if self._redis is not None:
+            self._call_redis('set', key, value, ex=self.ttl, nx=True)
+            return
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries.setdefault(key, value)
+
+    def delete(self, *keys: str) -> None:
+        """
+        Invalidate entries, replacing them with tombstones that expire after lock_ttl
+
+        Args:
+            *keys: The keys from key()
+        """
+        if self._redis is not None:
+            for key in keys:
+                self._call_redis('set', key, self.tombstone, ex=self.lock_ttl)
+            return
+        if self._entries is None:
+            return
+        with self._lock:
+            for key in keys:
+                self._entries[key] = self.tombstone
+
+    def get_or_set(self, key: str, loader: Callable[[], Optional[dict]]) -> Optional[dict]:
+        """
+        Get a cached dict, loading and caching it on a miss
+
+        Args:
+            key: The key from key()
+            loader: Called on a miss; returns the dict to cache, or None if there is nothing
+                    to cache (None is not cached)
+
+        Returns:
+            dict: The cached or freshly loaded dict, or None if the loader returned None
+        """
+        value = self.get(key)
+        # Tombstones are empty, so they count as misses
+        if value:
+            return orjson.loads(value)
+        
+        if self._redis is None:
+            return self._load(key, loader)
+        
+        lock_key = f'{key}:lock'
+        # If Redis is down nobody can hold the lock, so load straight away
+        if self._call_redis('set', lock_key, 1, nx=True, ex=self.lock_ttl, default=True):
+            try:
+                return self._load(key, loader)
+            finally:
+                self._call_redis('delete', lock_key)
+        
+        # Another worker is loading the same key; wait briefly for its result
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_poll_interval)
+            value = self.get(key)
+            if value:
+                return orjson.loads(value)
+        return self._load(key, loader)
+
+    def _load(self, key: str, loader: Callable[[], Optional[dict]]) -> Optional[dict]:
+        data = loader()
+        if data is None:
+            return None
+        value = orjson.dumps(data, option=ORJSON_OPTIONS)
+        self.set(key, value)
+        # Decoded again so hits and misses return identical values
+        return orjson.loads(value)
+
+
+response_cache = ResponseCache()
+video_cache = VideoCache()
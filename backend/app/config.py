@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool, StaticPool
 
 load_dotenv()
 
@@ -11,19 +12,54 @@ def get_database_uri():
     return 'sqlite:///app.db'
 
 
+# Helper to build engine options - reuse pooled connections across requests
+def get_engine_options():
+    options = {
+        # Compiled statements kept per engine; reused across calls with the same query shape
+        'query_cache_size': int(os.environ.get('DB_QUERY_CACHE_SIZE', 1200)),
+        # SQLite connections are shared between request threads by the pool
+        'connect_args': {'check_same_thread': False},
+    }
+    # Serverless/short-lived deployments open a fresh connection per checkout instead of pooling
+    if os.environ.get('DB_POOLCLASS', '').lower() == 'null':
+        options['poolclass'] = NullPool
+        return options
+    options.update({
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    })
+    return options
+
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = get_database_uri()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = get_engine_options()
+    SQLALCHEMY_RECORD_QUERIES = False
+    # Recorded queries slower than this many seconds are logged after each request
+    SLOW_QUERY_THRESHOLD = float(os.environ.get('SLOW_QUERY_THRESHOLD', 0.05))
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or os.environ.get('SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 86400))  # 24 hours
+    # Shared response cache; without it, list responses are not cached unless
+    # RESPONSE_CACHE_LOCAL_TTL is set, since other workers never see invalidations
+    REDIS_URL = os.environ.get('REDIS_URL')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    RESPONSE_CACHE_LOCAL_TTL = int(os.environ.get('RESPONSE_CACHE_LOCAL_TTL', 0))
+    # Serialized videos read by ID; the local TTL applies when REDIS_URL is unset
+    VIDEO_CACHE_TTL = int(os.environ.get('VIDEO_CACHE_TTL', 3600))
+    VIDEO_CACHE_LOCAL_TTL = int(os.environ.get('VIDEO_CACHE_LOCAL_TTL', 5))
 
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = get_database_uri()
+    SQLALCHEMY_RECORD_QUERIES = True
 
 
 class ProductionConfig(Config):
@@ -35,6 +71,12 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+    # A single shared connection keeps the in-memory database alive across threads
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
 
 
 config = {
@@ -0,0 +1,94 @@
+from flask import jsonify
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
+from app import db
+
+# Messages for the CHECK constraints that reject blank required columns
+NONEMPTY_CONSTRAINT_MESSAGES = {
+    'ck_users_username_nonempty': 'Username cannot be empty',
+    'ck_collections_name_nonempty': 'Collection name cannot be empty',
+    'ck_videos_youtube_id_nonempty': 'YouTube ID cannot be empty',
+    'ck_videos_title_nonempty': 'Video title cannot be empty',
+    'ck_transcripts_content_nonempty': 'Transcript content cannot be empty',
+}
+
+
+def get_check_constraint_name(e: IntegrityError):
+    """
+    Get the name of the CHECK constraint an IntegrityError was raised for
+    
+    Args:
+        e: The IntegrityError raised by the database driver
+        
+    Returns:
+        str: The constraint name, or None if the error is not a CHECK violation
+    """
+    # psycopg2 exposes the constraint directly; SQLite only names it in the message
+    diag = getattr(e.orig, 'diag', None)
+    if getattr(diag, 'constraint_name', None):
+        return diag.constraint_name
+    message = str(e.orig)
+    prefix = 'CHECK constraint failed: '
+    if message.startswith(prefix):
+        return message[len(prefix):].strip()
+    return None
+
+
+def is_foreign_key_violation(e: IntegrityError) -> bool:
+    """
+    Check if an IntegrityError was raised for a FOREIGN KEY constraint
+    
+    Args:
+        e: The IntegrityError raised by the database driver
+        
+    Returns:
+        bool: True if a referenced row doesn't exist, False for any other violation
+    """
+    # psycopg2 reports SQLSTATE 23503; SQLite only says so in the message
+    if getattr(e.orig, 'pgcode', None) == '23503':
+        return True
+    return 'FOREIGN KEY constraint failed' in str(e.orig)
+
+
+def register_error_handlers(app):
+    """
+    Register JSON error handlers shared by all routes
+    
+    Args:
+        app: The Flask application
+    """
+    @app.errorhandler(ValueError)
+    def handle_value_error(e):
+        return jsonify({
+            'error': 'Validation error',
+            'message': str(e)
+        }), 400
+
+    @app.errorhandler(IntegrityError)
+    def handle_integrity_error(e):
+        db.session.rollback()
+        constraint = get_check_constraint_name(e)
+        if constraint in NONEMPTY_CONSTRAINT_MESSAGES:
+            return jsonify({
+                'error': 'Validation error',
+                'message': NONEMPTY_CONSTRAINT_MESSAGES[constraint]
+            }), 400
+        return jsonify({
+            'error': 'Database error',
+            'message': str(e)
+        }), 500
+
+    @app.errorhandler(HTTPException)
+    def handle_http_exception(e):
+        return jsonify({
+            'error': 'Not found' if e.code == 404 else e.name,
+            'message': e.description
+        }), e.code
+
+    @app.errorhandler(Exception)
+    def handle_exception(e):
+        db.session.rollback()
+        return jsonify({
+            'error': 'Internal server error',
+            'message': str(e)
+        }), 500
@@ -1,7 +1,89 @@
+import hashlib
+import threading
+import time
 from functools import wraps
-from flask import jsonify, request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from app.services import UserService
+from cachetools import TTLCache
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt, get_current_user
+from app.services import UserService, TokenService
+
+# Decoded claims of recently verified tokens, keyed by a digest of the raw token
+_verified_tokens = TTLCache(maxsize=10_000, ttl=60)
+_verified_tokens_lock = threading.Lock()
+
+
+# flask_jwt_extended keeps the verified token on flask.g under these private names.
+# They match flask-jwt-extended 4.6.0 (pinned in requirements.txt) and must be
+# re-checked against verify_jwt_in_request() whenever that pin changes; the auth
+# tests fail if get_jwt()/get_current_user() stop seeing a cached token.
+def _jwt_verified_in_request() -> bool:
+    # verify_jwt_in_request(optional=True) leaves an empty dict when there is no token
+    return bool(g.get('_jwt_extended_jwt'))
+
+
+def _store_verified_jwt(jwt_header: dict, jwt_data: dict, user) -> None:
+    """Store an already verified token on flask.g the way verify_jwt_in_request does"""
+    g._jwt_extended_jwt_user = {'loaded_user': user}
+    g._jwt_extended_jwt_header = jwt_header
+    g._jwt_extended_jwt = jwt_data
+    g._jwt_extended_jwt_location = 'headers'
+
+
+def verify_jwt_cached():
+    """
+    Verify the request's JWT, skipping signature verification for recently seen tokens
+    
+    On a cache hit the decoded header and claims are stored on flask.g the same way
+    verify_jwt_in_request does, so get_jwt()/get_jwt_identity()/get_current_user()
+    keep working. Only access tokens that passed verify_jwt_in_request are cached;
+    the token type, expiry, not-before time, revocation and the user's existence are
+    still checked on every call. The user comes from the same primary-key cache as
+    the app's user_lookup_loader.
+    
+    Raises:
+        The flask_jwt_extended/PyJWT errors raised by verify_jwt_in_request
+    """
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header[7:] if auth_header.startswith('Bearer ') else None
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest() if token else None
+
+    if key is not None:
+        with _verified_tokens_lock:
+            cached = _verified_tokens.get(key)
+        if cached is not None:
+            jwt_header, jwt_data = cached
+            now = time.time()
+            if (
+                jwt_data.get('type') == 'access'
+                and jwt_data.get('nbf', 0) <= now < jwt_data['exp']
+                and not TokenService.is_token_revoked(jwt_data['jti'])
+            ):
+                user = UserService.get_user_by_id_cached(int(jwt_data['sub']))
+                if user is not None:
+                    _store_verified_jwt(jwt_header, jwt_data, user)
+                    return
+
+    # Cache miss, expired, revoked or user gone: let flask_jwt_extended verify (and raise)
+    jwt_header, jwt_data = verify_jwt_in_request()
+    if key is not None:
+        with _verified_tokens_lock:
+            _verified_tokens[key] = (jwt_header, jwt_data)
+
+
+def token_required(f):
+    """
+    Decorator to require a valid JWT for a route
+    
+    Drop-in for @jwt_required() that reuses the verification already done by the
+    auth middleware in this request, or verifies through the token cache.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not _jwt_verified_in_request():
+            verify_jwt_cached()
+        return f(*args, **kwargs)
+    
+    return decorated_function
 
 
 def auth_required(f):
@@ -38,17 +120,33 @@ def auth_required(f):
     return decorated_function
 
 
-def setup_auth_middleware(blueprint, exempt_routes=None):
+def load_current_user(f):
+    """
+    Mark a route as needing the user row re-read from the database
+    
+    By default the auth middleware checks the token version against the user from
+    the short-lived user cache. Routes marked with this decorator re-read the row,
+    so a change made by another worker takes effect immediately.
+    """
+    f.load_current_user = True
+    return f
+
+
+def setup_auth_middleware(blueprint, exempt_endpoints=None):
     """
     Setup authentication middleware for a blueprint
     
     Args:
         blueprint: The Flask blueprint to protect
-        exempt_routes: List of route endpoints to exempt from authentication
-                      Format: ['/login', '/logout', '/users'] (without /api prefix)
+        exempt_endpoints: List of view function names to exempt from authentication
+                          Format: ['login', 'logout', 'create_user'] (without blueprint prefix)
     """
-    if exempt_routes is None:
-        exempt_routes = ['/login', '/logout']
+    if exempt_endpoints is None:
+        exempt_endpoints = ['login', 'logout']
+    
+    # Flask has already matched the endpoint by the time before_request runs, so
+    # compare against fully-qualified endpoint names instead of parsing the path
+    exempt = frozenset(f'{blueprint.name}.{endpoint}' for endpoint in exempt_endpoints)
     
     @blueprint.before_request
     def require_auth():
@@ -56,48 +154,36 @@ def setup_auth_middleware(blueprint, exempt_routes=None):
         if request.method == 'OPTIONS':
             return None
 
-        # Get the path (without /api prefix)
-        path = request.path
-        
-        # Remove /api prefix if present
-        if path.startswith('/api'):
-            path = path[4:]  # Remove '/api'
-        
-        # Ensure path starts with /
-        if not path.startswith('/'):
-            path = '/' + path
-        
-        # Check if this route is exempt
-        # Allow exact matches or if path starts with exempt route + / (for sub-routes)
-        is_exempt = False
-        for exempt_route in exempt_routes:
-            if path == exempt_route:
-                is_exempt = True
-                break
-            # Also allow POST to /users (registration) but not other methods
-            if path == '/users' and request.method == 'POST':
-                is_exempt = True
-                break
-        
-        if is_exempt:
-            return None  # Allow request to proceed without auth
+        # Allow request to proceed without auth if this route is exempt
+        if request.endpoint in exempt:
+            return None
         
         # For all other routes, require authentication
         try:
-            verify_jwt_in_request()
-            current_user_id = int(get_jwt_identity())
+            verify_jwt_cached()
+            claims = get_jwt()
+            current_user_id = int(claims['sub'])
 
-            # Verify user still exists
-            user = UserService.get_user_by_id(current_user_id)
+            request.current_user_id = current_user_id
+            request.current_username = claims.get('u')
+
+            # Already loaded through the JWT user lookup (cached briefly to skip a SELECT)
+            user = get_current_user()
+            view = current_app.view_functions.get(request.endpoint)
+            if user is not None and getattr(view, 'load_current_user', False):
+                user = UserService.get_user_by_id(current_user_id, refresh=True)
             if not user:
                 return jsonify({
                     'error': 'Unauthorized',
                     'message': 'User not found'
                 }), 401
-
-            # Attach user to request context
+            # Tokens issued before the user's token_version was last bumped are rejected
+            if claims.get('v', 0) != user.token_version:
+                return jsonify({
+                    'error': 'Unauthorized',
+                    'message': 'Token has been revoked'
+                }), 401
             request.current_user = user
-            request.current_user_id = current_user_id
 
         except Exception as e:
             return jsonify({
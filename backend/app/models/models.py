@@ -1,11 +1,31 @@
+from typing import Optional
+from sqlalchemy.orm import validates
 from app import db
 
+
+def clean_required(value: Optional[str], message: str) -> str:
+    """Strip a required string column, raising ValueError with the message if it is blank"""
+    value = value.strip() if value else ''
+    if not value:
+        raise ValueError(message)
+    return value
+
+
+def clean_optional(value: Optional[str]) -> Optional[str]:
+    """Strip an optional string column, storing blank values as NULL"""
+    return (value.strip() or None) if value else None
+
+
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.CheckConstraint("length(trim(username)) > 0", name='ck_users_username_nonempty'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    password = db.Column(db.String(120), nullable=False)
-    collections = db.relationship('Collection', backref='user', lazy=True)
+    username = db.Column(db.String(80), unique=True, nullable=False, index=True)
+    password = db.Column(db.String(255), nullable=False)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    collections = db.relationship('Collection', backref='user', lazy=True, passive_deletes=True)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -13,12 +33,15 @@ class User(db.Model):
 
 class Collection(db.Model):
     __tablename__ = 'collections'
+    __table_args__ = (
+        db.CheckConstraint("length(trim(name)) > 0", name='ck_collections_name_nonempty'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
-    videos = db.relationship('Video', backref='collection', lazy=True)
+    videos = db.relationship('Video', back_populates='collection', lazy=True, passive_deletes=True)
 
     def __repr__(self):
         return f'<Collection {self.name}>'
@@ -26,13 +49,59 @@ class Collection(db.Model):
 
 class Video(db.Model):
     __tablename__ = 'videos'
+    __table_args__ = (
+        db.CheckConstraint("length(trim(youtube_id)) > 0", name='ck_videos_youtube_id_nonempty'),
+        db.CheckConstraint("length(trim(title)) > 0", name='ck_videos_title_nonempty'),
+        db.UniqueConstraint('youtube_id', name='uq_videos_youtube_id'),
+        # Serves collection filters ordered by id; also covers lookups by collection_id alone
+        db.Index('ix_videos_collection_id_id', 'collection_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    youtube_id = db.Column(db.String(32), unique=True, nullable=False)
+    youtube_id = db.Column(db.String(32), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
-    collection_id = db.Column(db.Integer, db.ForeignKey('collections.id'), nullable=False)
+    collection_id = db.Column(db.Integer, db.ForeignKey('collections.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
-    transcripts = db.relationship('Transcript', backref='video', lazy=True)
+    # Declared here rather than as a backref so Video.collection exists at import time
+    collection = db.relationship('Collection', back_populates='videos')
+    transcripts = db.relationship('Transcript', backref='video', lazy=True, passive_deletes=True)
+
+    # Messages for blank required columns, matching the ck_videos_*_nonempty constraints
+    REQUIRED_MESSAGES = {
+        'youtube_id': 'YouTube ID cannot be empty',
+        'title': 'Video title cannot be empty',
+    }
+
+    @classmethod
+    def clean_values(cls, values: dict) -> dict:
+        """
+        Apply the column validators to a dict of values, for Core INSERT and UPDATE
+        statements that bypass the ORM's @validates hooks
+
+        Args:
+            values: Column name to value; columns without a validator pass through
+
+        Returns:
+            dict: The values, stripped, with blank descriptions as None
+
+        Raises:
+            ValueError: If youtube_id or title is blank
+        """
+        cleaned = dict(values)
+        for key, message in cls.REQUIRED_MESSAGES.items():
+            if key in cleaned:
+                cleaned[key] = clean_required(cleaned[key], message)
+        if 'description' in cleaned:
+            cleaned['description'] = clean_optional(cleaned['description'])
+        return cleaned
+
+    @validates('youtube_id', 'title')
+    def _validate_required(self, key, value):
+        return clean_required(value, self.REQUIRED_MESSAGES[key])
+
+    @validates('description')
+    def _validate_description(self, key, value):
+        return clean_optional(value)
 
     def __repr__(self):
         return f'<Video {self.youtube_id}>'
@@ -40,8 +109,12 @@ class Video(db.Model):
 
 class Transcript(db.Model):
     __tablename__ = 'transcripts'
+    __table_args__ = (
+        db.CheckConstraint("length(trim(content)) > 0", name='ck_transcripts_content_nonempty'),
+        db.UniqueConstraint('video_id', 'chunk_index', name='uq_transcripts_video_id_chunk_index'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False)
+    video_id = db.Column(db.Integer, db.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False, index=True)
     content = db.Column(db.Text, nullable=False)
     chunk_index = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
@@ -49,3 +122,14 @@ class Transcript(db.Model):
     def __repr__(self):
         return f'<Transcript Video ID {self.video_id}, chunk {self.chunk_index}>'
 
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
@@ -0,0 +1,32 @@
+from flask import request
+from flask_sqlalchemy.record_queries import get_recorded_queries
+
+
+def register_slow_query_logging(app):
+    """
+    Log queries slower than SLOW_QUERY_THRESHOLD after each request, with the
+    statement, duration and the app code location that issued it
+
+    Only active when SQLALCHEMY_RECORD_QUERIES is enabled (development by default),
+    since recording adds overhead to every query.
+
+    Args:
+        app: The Flask application
+    """
+    if not app.config.get('SQLALCHEMY_RECORD_QUERIES'):
+        return
+    threshold = app.config.get('SLOW_QUERY_THRESHOLD', 0.05)
+
+    @app.after_request
+    def log_slow_queries(response):
+        for query in get_recorded_queries():
+            if query.duration > threshold:
+                app.logger.warning(
+                    'Slow query (%.1f ms) in %s %s at %s: %s',
+                    query.duration * 1000,
+                    request.method,
+                    request.path,
+                    query.location,
+                    query.statement
+                )
+        return response
@@ -1,7 +1,102 @@
-from flask import Blueprint
+from typing import Any, Callable, Iterable
+import msgspec
+import orjson
+from flask import Blueprint, Response, request, stream_with_context
+from app.cache import response_cache
+from app.json_provider import ORJSON_OPTIONS
 
 api_bp = Blueprint('api', __name__)
 
+
+def get_json_body():
+    """
+    Parse the request body as JSON with orjson, bypassing Flask's parsed-body cache
+    
+    Returns:
+        The decoded JSON value, or None if the body is empty or not valid JSON
+    """
+    data = request.get_data(cache=False)
+    if not data:
+        return None
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def get_int_arg(name):
+    """
+    Read an integer query parameter
+    
+    Args:
+        name: The query parameter name
+        
+    Returns:
+        The parameter as an int, or None if it is missing, empty or not an integer
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def decode_json_body(schema):
+    """
+    Parse and validate the request body against a msgspec Struct in a single pass
+    
+    Args:
+        schema: The msgspec.Struct type the body must match
+        
+    Returns:
+        An instance of schema built from the request body
+        
+    Raises:
+        msgspec.ValidationError: If the body does not match the schema
+        msgspec.DecodeError: If the body is empty or not valid JSON (catch after ValidationError,
+                             which subclasses it)
+    """
+    return msgspec.json.decode(request.get_data(cache=False), type=schema)
+
+
+def stream_json_list(list_key: str, rows: Iterable, encode_row: Callable[[Any], Any], cache_key: str) -> Response:
+    """
+    Stream {list_key: [...], "count": n} encoding each row as it comes off the cursor
+    
+    Each row is sent straight away; the parts are only joined once the stream
+    completes, to cache the body under cache_key when the response cache is enabled.
+    
+    Args:
+        list_key: The key of the list in the JSON object (e.g. 'videos')
+        rows: The rows to stream, typically a yield_per cursor
+        encode_row: Turns a row into the value to encode as a list item
+        cache_key: The versioned response cache key to store the full body under
+        
+    Returns:
+        Response: The streamed JSON response
+    """
+    def generate():
+        count = 0
+        parts = [b'{"' + list_key.encode() + b'":[']
+        yield parts[0]
+        for row in rows:
+            if count:
+                parts.append(b',')
+                yield b','
+            part = orjson.dumps(encode_row(row), option=ORJSON_OPTIONS)
+            parts.append(part)
+            yield part
+            count += 1
+        tail = b'],"count":' + str(count).encode() + b'}'
+        parts.append(tail)
+        yield tail
+        if response_cache.enabled:
+            response_cache.set(cache_key, b''.join(parts))
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
 # Import routes here
 from app.routes import users, collections, videos, transcripts
-
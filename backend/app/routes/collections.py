@@ -1,56 +1,49 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required
-from sqlalchemy.exc import IntegrityError
-from app.routes import api_bp
+from flask import abort, jsonify
+from app.routes import api_bp, get_json_body, get_int_arg
+from app.middleware.auth import token_required
 from app.services import CollectionService
+from app.serializers import collection_serializer
 
 
 @api_bp.route('/collections', methods=['GET'])
-@jwt_required()
+@token_required
 def get_all_collections():
     """
     Get all collections with optional pagination and user filtering
     
     Query Parameters:
         limit (int, optional): Maximum number of collections to return
-        offset (int, optional): Number of collections to skip
+        after_id (int, optional): Return collections after this ID (use next_after_id to page)
+        offset (int, optional): Deprecated, use after_id. Number of collections to skip
         user_id (int, optional): Filter collections by user ID
         
     Returns:
-        JSON response with list of collections
+        JSON response with list of collections and the next_after_id cursor
     """
-    try:
-        limit = request.args.get('limit', type=int)
-        offset = request.args.get('offset', type=int)
-        user_id = request.args.get('user_id', type=int)
-        
-        collections = CollectionService.get_all_collections(
-            limit=limit,
-            offset=offset,
-            user_id=user_id
-        )
-        
-        collections_data = [{
-            'id': collection.id,
-            'name': collection.name,
-            'description': collection.description,
-            'user_id': collection.user_id,
-            'created_at': collection.created_at.isoformat() if collection.created_at else None
-        } for collection in collections]
-        
-        return jsonify({
-            'collections': collections_data,
-            'count': len(collections_data)
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve collections',
-            'message': str(e)
-        }), 500
+    limit = get_int_arg('limit')
+    offset = get_int_arg('offset')
+    after_id = get_int_arg('after_id')
+    user_id = get_int_arg('user_id')
+    
+    collections = CollectionService.list_projection(
+        limit=limit,
+        offset=offset,
+        user_id=user_id,
+        after_id=after_id
+    )
+    
+    # A full page means there may be more rows after the last ID
+    next_after_id = collections[-1].id if limit and len(collections) == limit else None
+    
+    return jsonify({
+        'collections': collections,
+        'count': len(collections),
+        'next_after_id': next_after_id
+    }), 200
 
 
 @api_bp.route('/collections', methods=['POST'])
-@jwt_required()
+@token_required
 def create_collection():
     """
     Create a new collection
@@ -63,65 +56,44 @@ def create_collection():
     Returns:
         JSON response with created collection data
     """
-    try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
-        
-        name = data.get('name')
-        user_id = data.get('user_id')
-        description = data.get('description')
-        
-        if not name:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Collection name is required'
-            }), 400
-        
-        if not user_id:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'User ID is required'
-            }), 400
-        
-        collection = CollectionService.create_collection(
-            name=name,
-            user_id=user_id,
-            description=description
-        )
-        
+    data = get_json_body()
+    
+    if not data:
         return jsonify({
-            'id': collection.id,
-            'name': collection.name,
-            'description': collection.description,
-            'user_id': collection.user_id,
-            'created_at': collection.created_at.isoformat() if collection.created_at else None,
-            'message': 'Collection created successfully'
-        }), 201
-        
-    except ValueError as e:
+            'error': 'Invalid request',
+            'message': 'Request body must be JSON'
+        }), 400
+    
+    name = data.get('name')
+    user_id = data.get('user_id')
+    description = data.get('description')
+    
+    if not name:
         return jsonify({
             'error': 'Validation error',
-            'message': str(e)
+            'message': 'Collection name is required'
         }), 400
-    except IntegrityError as e:
-        return jsonify({
-            'error': 'Database error',
-            'message': str(e)
-        }), 500
-    except Exception as e:
+    
+    if not user_id:
         return jsonify({
-            'error': 'Failed to create collection',
-            'message': str(e)
-        }), 500
+            'error': 'Validation error',
+            'message': 'User ID is required'
+        }), 400
+    
+    collection = CollectionService.create_collection(
+        name=name,
+        user_id=user_id,
+        description=description
+    )
+    
+    return jsonify(collection_serializer.dump(
+        collection,
+        message='Collection created successfully'
+    )), 201
 
 
 @api_bp.route('/collections/<int:collection_id>', methods=['GET'])
-@jwt_required()
+@token_required
 def get_collection(collection_id):
     """
     Get a collection by ID
@@ -132,32 +104,16 @@ def get_collection(collection_id):
     Returns:
         JSON response with collection data
     """
-    try:
-        collection = CollectionService.get_collection_by_id(collection_id)
-        
-        if not collection:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Collection with ID {collection_id} not found'
-            }), 404
-        
-        return jsonify({
-            'id': collection.id,
-            'name': collection.name,
-            'description': collection.description,
-            'user_id': collection.user_id,
-            'created_at': collection.created_at.isoformat() if collection.created_at else None
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve collection',
-            'message': str(e)
-        }), 500
+    collection = CollectionService.get_collection_by_id(collection_id)
+    
+    if not collection:
+        abort(404, description=f'Collection with ID {collection_id} not found')
+    
+    return jsonify(collection_serializer.dump(collection)), 200
 
 
 @api_bp.route('/collections/<int:collection_id>', methods=['DELETE'])
-@jwt_required()
+@token_required
 def delete_collection(collection_id):
     """
     Delete a collection by ID
@@ -168,22 +124,11 @@ def delete_collection(collection_id):
     Returns:
         JSON response with deletion status
     """
-    try:
-        deleted = CollectionService.delete_collection(collection_id)
-        
-        if not deleted:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Collection with ID {collection_id} not found'
-            }), 404
-        
-        return jsonify({
-            'message': f'Collection with ID {collection_id} deleted successfully'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to delete collection',
-            'message': str(e)
-        }), 500
-
+    deleted = CollectionService.delete_collection(collection_id)
+    
+    if not deleted:
+        abort(404, description=f'Collection with ID {collection_id} not found')
+    
+    return jsonify({
+        'message': f'Collection with ID {collection_id} deleted successfully'
+    }), 200
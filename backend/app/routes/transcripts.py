@@ -1,56 +1,81 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required
+from operator import attrgetter
+from flask import Response, abort, jsonify
 from sqlalchemy.exc import IntegrityError
-from app.routes import api_bp
+from app.routes import api_bp, get_json_body, get_int_arg, stream_json_list
+from app.middleware.auth import token_required
 from app.services import TranscriptService
+from app.serializers import transcript_serializer
+from app.arrow import arrow_response, wants_arrow
+from app.cache import response_cache
+from app.errors import is_foreign_key_violation
 
 
 @api_bp.route('/transcripts', methods=['GET'])
-@jwt_required()
+@token_required
 def get_all_transcripts():
     """
     Get all transcripts with optional pagination and video filtering
     
     Query Parameters:
         limit (int, optional): Maximum number of transcripts to return
-        offset (int, optional): Number of transcripts to skip
+        after_video_id (int, optional): With after_chunk_index, return transcripts after this
+            (video_id, chunk_index) position (pass back the fields of next_cursor to page)
+        after_chunk_index (int, optional): See after_video_id
+        after_id (int, optional): Return transcripts after this ID, ordered by ID
+            (use next_after_id to page)
+        offset (int, optional): Deprecated, use the cursor. Number of transcripts to skip
         video_id (int, optional): Filter transcripts by video ID
         
     Returns:
-        JSON response with list of transcripts
+        JSON response with list of transcripts and the next_cursor / next_after_id
+        cursors, or an Arrow IPC stream of the same columns (cursors in the
+        X-Next-Cursor and X-Next-After-Id headers) when the client sends
+        Accept: application/vnd.apache.arrow.stream
     """
-    try:
-        limit = request.args.get('limit', type=int)
-        offset = request.args.get('offset', type=int)
-        video_id = request.args.get('video_id', type=int)
-        
-        transcripts = TranscriptService.get_all_transcripts(
-            limit=limit,
-            offset=offset,
-            video_id=video_id
-        )
-        
-        transcripts_data = [{
-            'id': transcript.id,
-            'video_id': transcript.video_id,
-            'content': transcript.content,
-            'chunk_index': getattr(transcript, 'chunk_index', 0),
-            'created_at': transcript.created_at.isoformat() if transcript.created_at else None
-        } for transcript in transcripts]
-        
-        return jsonify({
-            'transcripts': transcripts_data,
-            'count': len(transcripts_data)
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve transcripts',
-            'message': str(e)
-        }), 500
+    limit = get_int_arg('limit')
+    offset = get_int_arg('offset')
+    after_id = get_int_arg('after_id')
+    after_video_id = get_int_arg('after_video_id')
+    after_chunk_index = get_int_arg('after_chunk_index')
+    video_id = get_int_arg('video_id')
+    
+    transcripts = TranscriptService.list_projection(
+        limit=limit,
+        offset=offset,
+        video_id=video_id,
+        after_id=after_id,
+        after_video_id=after_video_id,
+        after_chunk_index=after_chunk_index
+    )
+    
+    # A full page means there may be more rows after the last one
+    next_after_id = None
+    next_cursor = None
+    if limit and len(transcripts) == limit:
+        last = transcripts[-1]
+        next_after_id = last.id
+        if after_id is None:
+            next_cursor = {'after_video_id': last.video_id, 'after_chunk_index': last.chunk_index}
+    
+    if wants_arrow():
+        fields = transcript_serializer.fields
+        headers = {}
+        if next_after_id is not None:
+            headers['X-Next-After-Id'] = str(next_after_id)
+        if next_cursor is not None:
+            headers['X-Next-Cursor'] = f"{next_cursor['after_video_id']}:{next_cursor['after_chunk_index']}"
+        return arrow_response(fields, map(attrgetter(*fields), transcripts), headers=headers)
+    
+    return jsonify({
+        'transcripts': transcripts,
+        'count': len(transcripts),
+        'next_cursor': next_cursor,
+        'next_after_id': next_after_id
+    }), 200
 
 
 @api_bp.route('/transcripts', methods=['POST'])
-@jwt_required()
+@token_required
 def create_transcript():
     """
     Create a new transcript
@@ -62,66 +87,52 @@ def create_transcript():
     Returns:
         JSON response with created transcript data
     """
+    data = get_json_body()
+    
+    if not data:
+        return jsonify({
+            'error': 'Invalid request',
+            'message': 'Request body must be JSON'
+        }), 400
+    
+    video_id = data.get('video_id')
+    content = data.get('content')
+    
+    if not video_id:
+        return jsonify({
+            'error': 'Validation error',
+            'message': 'Video ID is required'
+        }), 400
+    
+    if not content:
+        return jsonify({
+            'error': 'Validation error',
+            'message': 'Transcript content is required'
+        }), 400
+    
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
-        
-        video_id = data.get('video_id')
-        content = data.get('content')
-        
-        if not video_id:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Video ID is required'
-            }), 400
-        
-        if not content:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Transcript content is required'
-            }), 400
-        
         transcripts = TranscriptService.create_transcript(
             video_id=video_id,
             content=content
         )
-        transcripts_data = [{
-            'id': t.id,
-            'video_id': t.video_id,
-            'content': t.content,
-            'chunk_index': t.chunk_index,
-            'created_at': t.created_at.isoformat() if t.created_at else None
-        } for t in transcripts]
-        return jsonify({
-            'transcripts': transcripts_data,
-            'count': len(transcripts_data),
-            'message': f'Transcript saved in {len(transcripts_data)} chunk(s)'
-        }), 201
-        
-    except ValueError as e:
+    except IntegrityError as e:
+        # Anything else (e.g. blank content) is reported by the shared IntegrityError handler
+        if not is_foreign_key_violation(e):
+            raise
         return jsonify({
             'error': 'Validation error',
-            'message': str(e)
+            'message': f'Video with ID {video_id} does not exist'
         }), 400
-    except IntegrityError as e:
-        return jsonify({
-            'error': 'Database error',
-            'message': str(e)
-        }), 500
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to create transcript',
-            'message': str(e)
-        }), 500
+    
+    return jsonify({
+        'transcripts': transcripts,
+        'count': len(transcripts),
+        'message': f'Transcript saved in {len(transcripts)} chunk(s)'
+    }), 201
 
 
 @api_bp.route('/transcripts/<int:transcript_id>', methods=['GET'])
-@jwt_required()
+@token_required
 def get_transcript(transcript_id):
     """
     Get a transcript by ID
@@ -132,32 +143,16 @@ def get_transcript(transcript_id):
     Returns:
         JSON response with transcript data
     """
-    try:
-        transcript = TranscriptService.get_transcript_by_id(transcript_id)
-        
-        if not transcript:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Transcript with ID {transcript_id} not found'
-            }), 404
-        
-        return jsonify({
-            'id': transcript.id,
-            'video_id': transcript.video_id,
-            'content': transcript.content,
-            'chunk_index': getattr(transcript, 'chunk_index', 0),
-            'created_at': transcript.created_at.isoformat() if transcript.created_at else None
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve transcript',
-            'message': str(e)
-        }), 500
+    transcript = TranscriptService.get_transcript_by_id(transcript_id)
+    
+    if not transcript:
+        abort(404, description=f'Transcript with ID {transcript_id} not found')
+    
+    return jsonify(transcript_serializer.dump(transcript)), 200
 
 
-@api_bp.route('/transcripts/<int:video_id>', methods=['GET'])
-@jwt_required()
+@api_bp.route('/videos/<int:video_id>/transcripts', methods=['GET'])
+@token_required
 def get_transcripts_by_video(video_id):
     """
     Get all transcripts by video ID
@@ -166,30 +161,20 @@ def get_transcripts_by_video(video_id):
         video_id (int): The ID of the video
         
     Returns:
-        JSON response with list of transcripts
+        Streamed JSON response with list of transcripts, or the cached body
+        if it was streamed since the last transcript write
     """
-    try:
-        transcripts = TranscriptService.get_transcripts_by_video(video_id)
-        transcripts_data = [{
-            'id': transcript.id,
-            'video_id': transcript.video_id,
-            'content': transcript.content,
-            'chunk_index': getattr(transcript, 'chunk_index', 0),
-            'created_at': transcript.created_at.isoformat() if transcript.created_at else None
-        } for transcript in transcripts]
-        return jsonify({
-            'transcripts': transcripts_data,
-            'count': len(transcripts_data)
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve transcripts',
-            'message': str(e)
-        }), 500
+    cache_key = response_cache.key('transcripts', str(video_id))
+    body = response_cache.get(cache_key)
+    if body is not None:
+        return Response(body, mimetype='application/json'), 200
+    
+    rows = TranscriptService.iter_transcripts_by_video(video_id)
+    return stream_json_list('transcripts', rows, lambda m: m, cache_key), 200
 
 
 @api_bp.route('/transcripts/<int:transcript_id>', methods=['DELETE'])
-@jwt_required()
+@token_required
 def delete_transcript(transcript_id):
     """
     Delete a transcript by ID
@@ -200,21 +185,11 @@ def delete_transcript(transcript_id):
     Returns:
         JSON response with deletion status
     """
-    try:
-        deleted = TranscriptService.delete_transcript(transcript_id)
-        
-        if not deleted:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Transcript with ID {transcript_id} not found'
-            }), 404
-        
-        return jsonify({
-            'message': f'Transcript with ID {transcript_id} deleted successfully'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to delete transcript',
-            'message': str(e)
-        }), 500
+    deleted = TranscriptService.delete_transcript(transcript_id)
+    
+    if not deleted:
+        abort(404, description=f'Transcript with ID {transcript_id} not found')
+    
+    return jsonify({
+        'message': f'Transcript with ID {transcript_id} deleted successfully'
+    }), 200
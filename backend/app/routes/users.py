@@ -1,43 +1,41 @@
-from flask import jsonify, request
-from sqlalchemy.exc import IntegrityError
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt
-from app.routes import api_bp
-from app.services import UserService
+from flask import abort, jsonify
+from flask_jwt_extended import create_access_token, get_jwt
+from app.routes import api_bp, get_json_body, get_int_arg
+from app.services import UserService, TokenService
+from app.serializers import user_serializer
+from app.middleware.auth import load_current_user, token_required
 
 
 @api_bp.route('/users', methods=['GET'])
-@jwt_required()
+@token_required
 def get_all_users():
     """
     Get all users with optional pagination
     
     Query Parameters:
         limit (int, optional): Maximum number of users to return
-        offset (int, optional): Number of users to skip
+        after_id (int, optional): Return users after this ID (use next_after_id to page)
+        offset (int, optional): Deprecated, use after_id. Number of users to skip
         
     Returns:
-        JSON response with list of users
+        JSON response with list of users and the next_after_id cursor
     """
-    try:
-        limit = request.args.get('limit', type=int)
-        offset = request.args.get('offset', type=int)
-        
-        users = UserService.get_all_users(limit=limit, offset=offset)
-        
-        users_data = [{
-            'id': user.id,
-            'username': user.username
-        } for user in users]
-        
-        return jsonify({
-            'users': users_data,
-            'count': len(users_data)
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve users',
-            'message': str(e)
-        }), 500
+    limit = get_int_arg('limit')
+    offset = get_int_arg('offset')
+    after_id = get_int_arg('after_id')
+    
+    users = UserService.get_all_users(limit=limit, offset=offset, after_id=after_id)
+    
+    users_data = user_serializer.dump_many(users)
+    
+    # A full page means there may be more rows after the last ID
+    next_after_id = users_data[-1]['id'] if limit and len(users_data) == limit else None
+    
+    return jsonify({
+        'users': users_data,
+        'count': len(users_data),
+        'next_after_id': next_after_id
+    }), 200
 
 
 @api_bp.route('/users', methods=['POST'])
@@ -52,64 +50,44 @@ def create_user():
     Returns:
         JSON response with created user data
     """
-    try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
-        
-        username = data.get('username')
-        password = data.get('password')
-        
-        if not username:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Username is required'
-            }), 400
-        
-        if not password:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Password is required'
-            }), 400
-        
-        # Check if username already exists
-        if UserService.username_exists(username):
-            return jsonify({
-                'error': 'Conflict',
-                'message': f'Username "{username}" already exists'
-            }), 409
-        
-        user = UserService.create_user(username, password)
-        
+    data = get_json_body()
+    
+    if not data:
         return jsonify({
-            'id': user.id,
-            'username': user.username,
-            'message': 'User created successfully'
-        }), 201
-        
-    except ValueError as e:
+            'error': 'Invalid request',
+            'message': 'Request body must be JSON'
+        }), 400
+    
+    username = data.get('username')
+    password = data.get('password')
+    
+    if not username:
         return jsonify({
             'error': 'Validation error',
-            'message': str(e)
+            'message': 'Username is required'
         }), 400
-    except IntegrityError:
+    
+    if not password:
+        return jsonify({
+            'error': 'Validation error',
+            'message': 'Password is required'
+        }), 400
+    
+    user = UserService.create_user(username, password)
+    
+    # No row returned means the username already exists
+    if not user:
         return jsonify({
             'error': 'Conflict',
-            'message': f'Username "{data.get("username")}" already exists'
+            'message': f'Username "{username}" already exists'
         }), 409
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to create user',
-            'message': str(e)
-        }), 500
+    
+    return jsonify(user_serializer.dump(user, message='User created successfully')), 201
 
 
 @api_bp.route('/users/<int:user_id>', methods=['DELETE'])
-@jwt_required()
+@token_required
+@load_current_user
 def delete_user(user_id):
     """
     Delete a user by ID
@@ -120,24 +98,15 @@ def delete_user(user_id):
     Returns:
         JSON response with deletion status
     """
-    try:
-        deleted = UserService.delete_user(user_id)
-        
-        if not deleted:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'User with ID {user_id} not found'
-            }), 404
-        
-        return jsonify({
-            'message': f'User with ID {user_id} deleted successfully'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to delete user',
-            'message': str(e)
-        }), 500
+    deleted = UserService.delete_user(user_id)
+    UserService.invalidate_user_cache(user_id)
+    
+    if not deleted:
+        abort(404, description=f'User with ID {user_id} not found')
+    
+    return jsonify({
+        'message': f'User with ID {user_id} deleted successfully'
+    }), 200
 
 
 @api_bp.route('/login', methods=['POST'])
@@ -152,57 +121,53 @@ def login():
     Returns:
         JSON response with user data if authentication succeeds
     """
-    try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
-        
-        username = data.get('username')
-        password = data.get('password')
-        
-        if not username:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Username is required'
-            }), 400
-        
-        if not password:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Password is required'
-            }), 400
-        
-        user = UserService.login(username, password)
-        
-        if not user:
-            return jsonify({
-                'error': 'Authentication failed',
-                'message': 'Invalid username or password'
-            }), 401
-        
-        # Create JWT access token
-        access_token = create_access_token(identity=user.id)
-        
+    data = get_json_body()
+    
+    if not data:
         return jsonify({
-            'id': user.id,
-            'username': user.username,
-            'access_token': access_token,
-            'message': 'Login successful'
-        }), 200
-        
-    except Exception as e:
+            'error': 'Invalid request',
+            'message': 'Request body must be JSON'
+        }), 400
+    
+    username = data.get('username')
+    password = data.get('password')
+    
+    if not username:
         return jsonify({
-            'error': 'Failed to authenticate',
-            'message': str(e)
-        }), 500
+            'error': 'Validation error',
+            'message': 'Username is required'
+        }), 400
+    
+    if not password:
+        return jsonify({
+            'error': 'Validation error',
+            'message': 'Password is required'
+        }), 400
+    
+    user = UserService.login(username, password)
+    
+    if not user:
+        return jsonify({
+            'error': 'Authentication failed',
+            'message': 'Invalid username or password'
+        }), 401
+    
+    # Create JWT access token; claims let the auth middleware skip the user lookup
+    access_token = create_access_token(
+        identity=user.id,
+        additional_claims={'u': user.username, 'v': user.token_version}
+    )
+    
+    return jsonify({
+        'id': user.id,
+        'username': user.username,
+        'access_token': access_token,
+        'message': 'Login successful'
+    }), 200
 
 
 @api_bp.route('/logout', methods=['POST'])
-@jwt_required()
+@token_required
 def logout():
     """
     Logout a user (revoke their token)
@@ -213,19 +178,11 @@ def logout():
     Returns:
         JSON response with logout status
     """
-    try:
-        # Get the JWT token
-        jti = get_jwt()['jti']
-        
-        # In a production app, you might want to add the token to a blacklist
-        # For now, we'll just return success (client should discard the token)
-        
-        return jsonify({
-            'message': 'Logout successful'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to logout',
-            'message': str(e)
-        }), 500
+    # Revoke the JWT so it can't be reused until it expires
+    claims = get_jwt()
+    TokenService.revoke_token(claims['jti'], claims['exp'])
+    
+    return jsonify({
+        'message': 'Logout successful'
+    }), 200
+
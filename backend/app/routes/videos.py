@@ -1,12 +1,25 @@
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required
+import msgspec
+import orjson
+from flask import Response, abort, jsonify, request
 from sqlalchemy.exc import IntegrityError
-from app.routes import api_bp
+from app.routes import api_bp, decode_json_body, get_int_arg, stream_json_list
+from app.middleware.auth import token_required
 from app.services import VideoService
+from app.arrow import arrow_response, wants_arrow
+from app.cache import response_cache
+from app.errors import get_check_constraint_name
+from app.json_provider import ORJSON_OPTIONS
+from app.schemas import VideoCreate, VideoUpdate
+from app.serializers import video_serializer
+
+# Column order of VideoService.get_all_videos_raw rows
+VIDEO_KEYS = video_serializer.fields
+# Columns of VideoService.list_videos_lite rows
+VIDEO_LITE_KEYS = ('id', 'youtube_id', 'title')
 
 
 @api_bp.route('/videos', methods=['GET'])
-@jwt_required()
+@token_required
 def get_all_videos():
     """
     Get all videos with optional pagination and collection filtering
@@ -15,43 +28,87 @@ def get_all_videos():
         limit (int, optional): Maximum number of videos to return
         offset (int, optional): Number of videos to skip
         collection_id (int, optional): Filter videos by collection ID
+        fields (str, optional): 'lite' to return only id, youtube_id and title
         
     Returns:
-        JSON response with list of videos
+        JSON response with list of videos, or an Arrow IPC stream of the same
+        columns when the client sends Accept: application/vnd.apache.arrow.stream.
+        Carries an ETag; a matching If-None-Match gets an empty 304 instead.
     """
-    try:
-        limit = request.args.get('limit', type=int)
-        offset = request.args.get('offset', type=int)
-        collection_id = request.args.get('collection_id', type=int)
-        
-        videos = VideoService.get_all_videos(
-            limit=limit,
-            offset=offset,
-            collection_id=collection_id
-        )
-        
-        videos_data = [{
-            'id': video.id,
-            'youtube_id': video.youtube_id,
-            'title': video.title,
-            'description': video.description,
-            'collection_id': video.collection_id,
-            'created_at': video.created_at.isoformat() if video.created_at else None
-        } for video in videos]
+    limit = get_int_arg('limit')
+    offset = get_int_arg('offset')
+    collection_id = get_int_arg('collection_id')
+    lite = request.args.get('fields') == 'lite'
+    
+    if wants_arrow():
+        if lite:
+            rows = VideoService.list_videos_lite(
+                collection_id=collection_id,
+                limit=limit,
+                offset=offset
+            )
+            response = arrow_response(VIDEO_LITE_KEYS, [tuple(row.values()) for row in rows])
+        else:
+            rows = VideoService.get_all_videos_raw(
+                limit=limit,
+                offset=offset,
+                collection_id=collection_id
+            )
+            response = arrow_response(VIDEO_KEYS, rows)
+    else:
+        # Encoded JSON pages are cached until the next video write
+        cache_key = response_cache.key('videos', f'{collection_id}:{limit}:{offset}:{lite}')
+        body = response_cache.get(cache_key)
+        if body is None:
+            if lite:
+                videos_data = [
+                    dict(row) for row in VideoService.list_videos_lite(
+                        collection_id=collection_id,
+                        limit=limit,
+                        offset=offset
+                    )
+                ]
+            else:
+                rows = VideoService.get_all_videos_raw(
+                    limit=limit,
+                    offset=offset,
+                    collection_id=collection_id
+                )
+                videos_data = [dict(zip(VIDEO_KEYS, row)) for row in rows]
+            body = orjson.dumps({'videos': videos_data, 'count': len(videos_data)}, option=ORJSON_OPTIONS)
+            response_cache.set(cache_key, body)
+        response = Response(body, status=200, mimetype='application/json')
+    
+    # Unchanged pages are answered with 304 and no body
+    response.vary.add('Accept')
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@api_bp.route('/collections/<int:collection_id>/videos', methods=['GET'])
+@token_required
+def get_videos_by_collection(collection_id):
+    """
+    Get all videos in a collection
+    
+    Path Parameters:
+        collection_id (int): The ID of the collection
         
-        return jsonify({
-            'videos': videos_data,
-            'count': len(videos_data)
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve videos',
-            'message': str(e)
-        }), 500
+    Returns:
+        Streamed JSON response with list of videos, or the cached body
+        if it was streamed since the last video write
+    """
+    cache_key = response_cache.key('videos', f'collection:{collection_id}')
+    body = response_cache.get(cache_key)
+    if body is not None:
+        return Response(body, mimetype='application/json'), 200
+    
+    rows = VideoService.iter_videos_by_collection(collection_id)
+    return stream_json_list('videos', rows, lambda row: dict(zip(VIDEO_KEYS, row)), cache_key), 200
 
 
 @api_bp.route('/videos', methods=['POST'])
-@jwt_required()
+@token_required
 def create_video():
     """
     Create a new video
@@ -66,73 +123,42 @@ def create_video():
         JSON response with created video data
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
-        
-        youtube_id = data.get('youtube_id')
-        title = data.get('title')
-        collection_id = data.get('collection_id')
-        description = data.get('description')
-        
-        if not youtube_id:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'YouTube ID is required'
-            }), 400
-        
-        if not title:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Video title is required'
-            }), 400
-        
-        if not collection_id:
-            return jsonify({
-                'error': 'Validation error',
-                'message': 'Collection ID is required'
-            }), 400
-        
-        video = VideoService.create_video(
-            youtube_id=youtube_id,
-            title=title,
-            collection_id=collection_id,
-            description=description
-        )
-        
-        return jsonify({
-            'id': video.id,
-            'youtube_id': video.youtube_id,
-            'title': video.title,
-            'description': video.description,
-            'collection_id': video.collection_id,
-            'created_at': video.created_at.isoformat() if video.created_at else None,
-            'message': 'Video created successfully'
-        }), 201
-        
-    except ValueError as e:
+        body = decode_json_body(VideoCreate)
+    except msgspec.ValidationError as e:
         return jsonify({
             'error': 'Validation error',
             'message': str(e)
         }), 400
+    except msgspec.DecodeError:
+        return jsonify({
+            'error': 'Invalid request',
+            'message': 'Request body must be JSON'
+        }), 400
+    
+    try:
+        video = VideoService.create_video(
+            youtube_id=body.youtube_id,
+            title=body.title,
+            collection_id=body.collection_id,
+            description=body.description
+        )
     except IntegrityError as e:
+        # Blank fields are reported by the shared IntegrityError handler
+        if get_check_constraint_name(e):
+            raise
         return jsonify({
             'error': 'Database error',
             'message': 'A video with this YouTube ID already exists'
         }), 409
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to create video',
-            'message': str(e)
-        }), 500
+    
+    return jsonify(video_serializer.dump(
+        video,
+        message='Video created successfully'
+    )), 201
 
 
 @api_bp.route('/videos/<int:video_id>', methods=['GET'])
-@jwt_required()
+@token_required
 def get_video(video_id):
     """
     Get a video by ID
@@ -141,35 +167,46 @@ def get_video(video_id):
         video_id (int): The ID of the video
         
     Returns:
-        JSON response with video data
+        JSON response with video data. Carries an ETag; a matching
+        If-None-Match gets an empty 304 instead.
     """
-    try:
-        video = VideoService.get_video_by_id(video_id)
-        
-        if not video:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Video with ID {video_id} not found'
-            }), 404
-        
-        return jsonify({
-            'id': video.id,
-            'youtube_id': video.youtube_id,
-            'title': video.title,
-            'description': video.description,
-            'collection_id': video.collection_id,
-            'created_at': video.created_at.isoformat() if video.created_at else None
-        }), 200
+    video = VideoService.get_video_by_id_cached(video_id)
+    
+    if not video:
+        abort(404, description=f'Video with ID {video_id} not found')
+    
+    response = jsonify(video)
+    # Unchanged videos are answered with 304 and no body
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@api_bp.route('/videos/youtube/<youtube_id>', methods=['GET'])
+@token_required
+def get_video_by_youtube_id(youtube_id):
+    """
+    Get a video by its YouTube ID
+    
+    Path Parameters:
+        youtube_id (str): The YouTube ID of the video
         
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to retrieve video',
-            'message': str(e)
-        }), 500
+    Returns:
+        JSON response with video data. Carries an ETag; a matching
+        If-None-Match gets an empty 304 instead.
+    """
+    video = VideoService.get_video_by_youtube_id_cached(youtube_id)
+    
+    if not video:
+        abort(404, description=f'Video with YouTube ID {youtube_id} not found')
+    
+    response = jsonify(video)
+    # Unchanged videos are answered with 304 and no body
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @api_bp.route('/videos/<int:video_id>', methods=['PUT'])
-@jwt_required()
+@token_required
 def update_video(video_id):
     """
     Update a video by ID
@@ -186,55 +223,36 @@ def update_video(video_id):
         JSON response with updated video data
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'error': 'Invalid request',
-                'message': 'Request body must be JSON'
-            }), 400
-        
-        title = data.get('title')
-        description = data.get('description')
-        collection_id = data.get('collection_id')
-        
-        video = VideoService.update_video(
-            video_id=video_id,
-            title=title,
-            description=description,
-            collection_id=collection_id
-        )
-        
-        if not video:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Video with ID {video_id} not found'
-            }), 404
-        
-        return jsonify({
-            'id': video.id,
-            'youtube_id': video.youtube_id,
-            'title': video.title,
-            'description': video.description,
-            'collection_id': video.collection_id,
-            'created_at': video.created_at.isoformat() if video.created_at else None,
-            'message': 'Video updated successfully'
-        }), 200
-        
-    except ValueError as e:
+        body = decode_json_body(VideoUpdate)
+    except msgspec.ValidationError as e:
         return jsonify({
             'error': 'Validation error',
             'message': str(e)
         }), 400
-    except Exception as e:
+    except msgspec.DecodeError:
         return jsonify({
-            'error': 'Failed to update video',
-            'message': str(e)
-        }), 500
+            'error': 'Invalid request',
+            'message': 'Request body must be JSON'
+        }), 400
+    
+    video = VideoService.update_video(
+        video_id=video_id,
+        title=body.title,
+        description=body.description,
+        collection_id=body.collection_id
+    )
+    
+    if not video:
+        abort(404, description=f'Video with ID {video_id} not found')
+    
+    return jsonify(video_serializer.dump(
+        video,
+        message='Video updated successfully'
+    )), 200
 
 
 @api_bp.route('/videos/<int:video_id>', methods=['DELETE'])
-@jwt_required()
+@token_required
 def delete_video(video_id):
     """
     Delete a video by ID
@@ -245,21 +263,11 @@ def delete_video(video_id):
     Returns:
         JSON response with deletion status
     """
-    try:
-        deleted = VideoService.delete_video(video_id)
-        
-        if not deleted:
-            return jsonify({
-                'error': 'Not found',
-                'message': f'Video with ID {video_id} not found'
-            }), 404
-        
-        return jsonify({
-            'message': f'Video with ID {video_id} deleted successfully'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': 'Failed to delete video',
-            'message': str(e)
-        }), 500
+    deleted = VideoService.delete_video(video_id)
+    
+    if not deleted:
+        abort(404, description=f'Video with ID {video_id} not found')
+    
+    return jsonify({
+        'message': f'Video with ID {video_id} deleted successfully'
+    }), 200
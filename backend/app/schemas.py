@@ -0,0 +1,17 @@
+from typing import Optional
+import msgspec
+
+
+class VideoCreate(msgspec.Struct):
+    """Request body for creating a video"""
+    youtube_id: str
+    title: str
+    collection_id: int
+    description: Optional[str] = None
+
+
+class VideoUpdate(msgspec.Struct):
+    """Request body for updating a video; omitted fields are left unchanged"""
+    title: Optional[str] = None
+    description: Optional[str] = None
+    collection_id: Optional[int] = None
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
+from typing import Optional
+
+
+class Serializer:
+    """Dumps a fixed set of model attributes to a dict using a getter built once"""
+    __slots__ = ('fields', '_getter')
+
+    def __init__(self, *fields):
+        self.fields = fields
+        self._getter = attrgetter(*fields)
+
+    def dump(self, obj, **extra):
+        """
+        Serialize a single object
+        
+        Args:
+            obj: The model instance to serialize
+            **extra: Additional keys merged into the result (e.g. a message)
+            
+        Returns:
+            dict: Mapping of field name to value
+        """
+        data = dict(zip(self.fields, self._getter(obj)))
+        if extra:
+            data.update(extra)
+        return data
+
+    def dump_many(self, objs):
+        """Serialize an iterable of objects"""
+        fields, getter = self.fields, self._getter
+        return [dict(zip(fields, getter(obj))) for obj in objs]
+
+
+user_serializer = Serializer('id', 'username')
+collection_serializer = Serializer('id', 'name', 'description', 'user_id', 'created_at')
+transcript_serializer = Serializer('id', 'video_id', 'content', 'chunk_index', 'created_at')
+video_serializer = Serializer('id', 'youtube_id', 'title', 'description', 'collection_id', 'created_at')
+
+
+# Slotted row objects for projection queries; orjson encodes dataclasses natively,
+# so list endpoints never build an intermediate dict per row
+@dataclass
+class CollectionRow:
+    __slots__ = ('id', 'name', 'description', 'user_id', 'created_at')
+    id: int
+    name: str
+    description: Optional[str]
+    user_id: int
+    created_at: Optional[datetime]
+
+
+@dataclass
+class TranscriptRow:
+    __slots__ = ('id', 'video_id', 'content', 'chunk_index', 'created_at')
+    id: int
+    video_id: int
+    content: str
+    chunk_index: int
+    created_at: Optional[datetime]
@@ -2,6 +2,7 @@ from app.services.user_service import UserService
 from app.services.collection_service import CollectionService
 from app.services.video_service import VideoService
 from app.services.transcript_service import TranscriptService
+from app.services.token_service import TokenService
 
-__all__ = ['UserService', 'CollectionService', 'VideoService', 'TranscriptService']
+__all__ = ['UserService', 'CollectionService', 'VideoService', 'TranscriptService', 'TokenService']
 
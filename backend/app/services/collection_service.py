@@ -1,6 +1,10 @@
 from typing import Optional, List
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import selectinload
 from app import db
-from app.models.models import Collection
+from app.cache import response_cache
+from app.models.models import Collection, Video
+from app.serializers import CollectionRow
 from app.services.user_service import UserService
 
 
@@ -20,8 +24,9 @@ class CollectionService:
             
         Raises:
             ValueError: If name is empty or user doesn't exist
+            IntegrityError: If name is blank (ck_collections_name_nonempty)
         """
-        if not name or not name.strip():
+        if not name:
             raise ValueError("Collection name cannot be empty")
         
         if not UserService.user_exists(user_id):
@@ -47,13 +52,14 @@ class CollectionService:
         Returns:
             Collection: The collection object if found, None otherwise
         """
-        return Collection.query.get(collection_id)
+        return db.session.get(Collection, collection_id)
 
     @staticmethod
     def get_all_collections(
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        with_videos: bool = False
     ) -> List[Collection]:
         """
         Get all collections with optional pagination and user filtering
@@ -62,18 +68,59 @@ class CollectionService:
             limit: Maximum number of collections to return
             offset: Number of collections to skip
             user_id: Optional user ID to filter collections by user
+            with_videos: Eager-load videos and their transcripts in batched IN queries
             
         Returns:
             List[Collection]: List of collection objects
         """
-        query = Collection.query
+        stmt = select(Collection)
+        if with_videos:
+            stmt = stmt.options(
+                selectinload(Collection.videos).selectinload(Video.transcripts)
+            )
         if user_id is not None:
-            query = query.filter_by(user_id=user_id)
+            stmt = stmt.filter_by(user_id=user_id)
         if offset is not None:
-            query = query.offset(offset)
+            stmt = stmt.offset(offset)
         if limit is not None:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return db.session.scalars(stmt).all()
+
+    @staticmethod
+    def list_projection(
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        user_id: Optional[int] = None,
+        after_id: Optional[int] = None
+    ) -> List[CollectionRow]:
+        """
+        Get the serialized columns of all collections without hydrating ORM objects
+        
+        Args:
+            limit: Maximum number of collections to return
+            offset: Number of collections to skip (deprecated, use after_id)
+            user_id: Optional user ID to filter collections by user
+            after_id: Only return collections with an ID greater than this (keyset pagination)
+            
+        Returns:
+            List[CollectionRow]: Rows of id, name, description, user_id and created_at
+        """
+        stmt = select(
+            Collection.id,
+            Collection.name,
+            Collection.description,
+            Collection.user_id,
+            Collection.created_at
+        ).order_by(Collection.id)
+        if user_id is not None:
+            stmt = stmt.filter_by(user_id=user_id)
+        if after_id is not None:
+            stmt = stmt.where(Collection.id > after_id)
+        if offset is not None:
+            stmt = stmt.offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return [CollectionRow(*row) for row in db.session.execute(stmt)]
 
     @staticmethod
     def delete_collection(collection_id: int) -> bool:
@@ -86,13 +133,18 @@ class CollectionService:
         Returns:
             bool: True if collection was deleted, False if collection not found
         """
-        collection = CollectionService.get_collection_by_id(collection_id)
-        if not collection:
-            return False
+        # Imported here because VideoService depends on this module
+        from app.services.video_service import VideoService
         
-        db.session.delete(collection)
+        # Deleted explicitly so their cache entries can be invalidated; transcripts are
+        # removed by the cascade
+        videos = VideoService.delete_videos_in_collections([collection_id])
+        result = db.session.execute(delete(Collection).where(Collection.id == collection_id))
         db.session.commit()
-        return True
+        VideoService.invalidate_collection(collection_id)
+        VideoService.invalidate_video_cache(videos)
+        response_cache.invalidate('videos', 'transcripts')
+        return result.rowcount > 0
 
     @staticmethod
     def collection_exists(collection_id: int) -> bool:
@@ -105,18 +157,24 @@ class CollectionService:
         Returns:
             bool: True if collection exists, False otherwise
         """
-        return Collection.query.filter_by(id=collection_id).first() is not None
+        return db.session.scalar(select(exists().where(Collection.id == collection_id)))
 
     @staticmethod
-    def get_collections_by_user(user_id: int) -> List[Collection]:
+    def get_collections_by_user(user_id: int, include_videos: bool = False) -> List[Collection]:
         """
         Get all collections for a specific user
         
         Args:
             user_id: The ID of the user
+            include_videos: Eager-load videos and their transcripts in batched IN queries
             
         Returns:
             List[Collection]: List of collection objects for the user
         """
-        return Collection.query.filter_by(user_id=user_id).all()
+        stmt = select(Collection).filter_by(user_id=user_id)
+        if include_videos:
+            stmt = stmt.options(
+                selectinload(Collection.videos).selectinload(Video.transcripts)
+            )
+        return db.session.scalars(stmt).all()
 
@@ -0,0 +1,60 @@
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import delete, select
+from app import db
+from app.models.models import RevokedToken
+
+# Process-local copy of unexpired revoked JTIs, reloaded from the database periodically
+_REFRESH_INTERVAL = 30
+_revoked_jtis = set()
+# Never refreshed; time.monotonic() can be below the interval on a freshly booted host
+_last_refresh = float('-inf')
+_revoked_lock = threading.Lock()
+
+
+class TokenService:
+    @staticmethod
+    def revoke_token(jti: str, expires_at: int) -> None:
+        """
+        Revoke a JWT so it is rejected for the rest of its lifetime
+        
+        Args:
+            jti: The unique identifier of the token
+            expires_at: The token's exp claim (Unix timestamp)
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        # Expired tokens are rejected anyway; prune them while we're writing
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        db.session.add(RevokedToken(
+            jti=jti,
+            expires_at=datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None)
+        ))
+        db.session.commit()
+        with _revoked_lock:
+            _revoked_jtis.add(jti)
+
+    @staticmethod
+    def is_token_revoked(jti: str) -> bool:
+        """
+        Check whether a JWT has been revoked
+        
+        Answers from the in-memory set; the set is reloaded from the database at
+        most every few seconds so revocations from other workers are picked up.
+        
+        Args:
+            jti: The unique identifier of the token
+            
+        Returns:
+            bool: True if the token has been revoked, False otherwise
+        """
+        global _revoked_jtis, _last_refresh
+        if time.monotonic() - _last_refresh > _REFRESH_INTERVAL:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            jtis = set(db.session.execute(
+                select(RevokedToken.jti).where(RevokedToken.expires_at >= now)
+            ).scalars())
+            with _revoked_lock:
+                _revoked_jtis = jtis
+                _last_refresh = time.monotonic()
+        return jti in _revoked_jtis
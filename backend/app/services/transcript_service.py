@@ -1,7 +1,13 @@
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Optional, List, Iterator
+from sqlalchemy import delete, exists, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from app import db
+from app.cache import response_cache
 from app.models.models import Transcript
-from app.services.video_service import VideoService
+from app.serializers import TranscriptRow
 
 # Chunk size by total transcript length (chars): ~5min, ~10min, ~20min, 1hr+
 _CHUNK_SIZE_BY_LENGTH = [
@@ -23,20 +29,24 @@ def _chunk_size_for_length(length: int) -> int:
 def _split_into_chunks(content: str, chunk_size: int) -> List[str]:
     """Split content into chunks, breaking at word boundaries when possible."""
     content = content.strip()
-    if not content:
-        return []
+    length = len(content)
     chunks = []
     start = 0
-    while start < len(content):
-        end = min(start + chunk_size, len(content))
-        if end < len(content):
-            # Try to break at last space in this range
+    while start < length:
+        end = stop = min(start + chunk_size, length)
+        if end < length:
+            # Break at the last space in this range; the space itself is dropped
+            # so the chunk rarely needs stripping, and the next chunk starts after it
             last_space = content.rfind(" ", start, end + 1)
             if last_space > start:
-                end = last_space + 1
-        chunks.append(content[start:end].strip())
-        start = end
-    return [c for c in chunks if c]
+                end, stop = last_space, last_space + 1
+        chunk = content[start:end]
+        if chunk and (chunk[0].isspace() or chunk[-1].isspace()):
+            chunk = chunk.strip()
+        if chunk:
+            chunks.append(chunk)
+        start = stop
+    return chunks
 
 
 class TranscriptService:
@@ -44,46 +54,67 @@ class TranscriptService:
     def create_transcript(
         video_id: int,
         content: str
-    ) -> List[Transcript]:
+    ) -> List[TranscriptRow]:
         """
         Create transcript chunks for a video from full transcript content.
         Chunk size is chosen by total length (e.g. 2k for short, 8k for long).
         Replaces any existing transcript chunks for this video.
+        The video's existence is enforced by the foreign key rather than a
+        separate lookup. All chunks are written in one bulk
+        INSERT ... ON CONFLICT (video_id, chunk_index) DO UPDATE ... RETURNING, so
+        existing chunks are updated in place, and chunks past the new end are deleted.
 
         Args:
             video_id: ID of the video this transcript belongs to
             content: Full transcript content
 
         Returns:
-            List[Transcript]: Created transcript chunks, ordered by chunk_index
+            List[TranscriptRow]: Created transcript chunks, ordered by chunk_index
 
         Raises:
-            ValueError: If content is empty or video doesn't exist
+            ValueError: If content is empty
+            IntegrityError: If the video doesn't exist
         """
-        if not content or not content.strip():
+        text = content.strip() if content else ''
+        if not text:
             raise ValueError("Transcript content cannot be empty")
 
-        if not VideoService.video_exists(video_id):
-            raise ValueError(f"Video with ID {video_id} does not exist")
-
-        text = content.strip()
         size = _chunk_size_for_length(len(text))
         chunk_texts = _split_into_chunks(text, size)
 
-        # Replace existing transcripts for this video
-        Transcript.query.filter_by(video_id=video_id).delete()
+        # Stamp every chunk of the batch with the same (naive UTC) creation time
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        rows = [
+            {'video_id': video_id, 'content': c, 'chunk_index': i, 'created_at': created_at}
+            for i, c in enumerate(chunk_texts)
+        ]
 
-        transcripts = []
-        for i, chunk_content in enumerate(chunk_texts):
-            t = Transcript(
-                video_id=video_id,
-                content=chunk_content,
-                chunk_index=i,
+        insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+        stmt = insert(Transcript)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['video_id', 'chunk_index'],
+            set_={'content': stmt.excluded.content, 'created_at': stmt.excluded.created_at}
+        )
+        # IDs of inserted or updated chunks come back with the statement, so no re-query is
+        # needed; they're matched up by chunk_index because sort_by_parameter_order would
+        # make SQLAlchemy send one INSERT per chunk
+        stmt = stmt.returning(Transcript.id, Transcript.chunk_index)
+        try:
+            ids = {chunk_index: transcript_id for transcript_id, chunk_index in db.session.execute(stmt, rows)}
+            # Trim chunks left over from a longer previous transcript
+            db.session.execute(
+                delete(Transcript)
+                .where(Transcript.video_id == video_id, Transcript.chunk_index >= len(rows))
             )
-            db.session.add(t)
-            transcripts.append(t)
-        db.session.commit()
-        return transcripts
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise
+        response_cache.invalidate('transcripts')
+        return [
+            TranscriptRow(ids[row['chunk_index']], video_id, row['content'], row['chunk_index'], created_at)
+            for row in rows
+        ]
 
     @staticmethod
     def get_transcript_by_id(transcript_id: int) -> Optional[Transcript]:
@@ -96,7 +127,7 @@ class TranscriptService:
         Returns:
             Transcript: The transcript object if found, None otherwise
         """
-        return Transcript.query.get(transcript_id)
+        return db.session.get(Transcript, transcript_id)
 
     @staticmethod
     def get_all_transcripts(
@@ -115,16 +146,69 @@ class TranscriptService:
         Returns:
             List[Transcript]: List of transcript objects
         """
-        query = Transcript.query
+        stmt = select(Transcript)
         if video_id is not None:
-            query = query.filter_by(video_id=video_id).order_by(Transcript.chunk_index)
+            stmt = stmt.filter_by(video_id=video_id).order_by(Transcript.chunk_index)
         else:
-            query = query.order_by(Transcript.video_id, Transcript.chunk_index)
+            stmt = stmt.order_by(Transcript.video_id, Transcript.chunk_index)
         if offset is not None:
-            query = query.offset(offset)
+            stmt = stmt.offset(offset)
         if limit is not None:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return db.session.scalars(stmt).all()
+
+    @staticmethod
+    def list_projection(
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        video_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        after_video_id: Optional[int] = None,
+        after_chunk_index: Optional[int] = None
+    ) -> List[TranscriptRow]:
+        """
+        Get the serialized columns of all transcripts without hydrating ORM objects
+        
+        Args:
+            limit: Maximum number of transcripts to return
+            offset: Number of transcripts to skip (deprecated, use the keyset cursor)
+            video_id: Optional video ID to filter transcripts by video
+            after_id: Only return transcripts with an ID greater than this (keyset
+                      pagination); results are then ordered by ID
+            after_video_id: With after_chunk_index, only return transcripts after this
+                            (video_id, chunk_index) position (keyset pagination over
+                            the default ordering)
+            after_chunk_index: See after_video_id
+            
+        Returns:
+            List[TranscriptRow]: Rows of id, video_id, content, chunk_index and created_at
+        """
+        stmt = select(
+            Transcript.id,
+            Transcript.video_id,
+            Transcript.content,
+            Transcript.chunk_index,
+            Transcript.created_at
+        )
+        if video_id is not None:
+            stmt = stmt.filter_by(video_id=video_id)
+        if after_id is not None:
+            stmt = stmt.where(Transcript.id > after_id).order_by(Transcript.id)
+        else:
+            if after_video_id is not None and after_chunk_index is not None:
+                # Seeks on the (video_id, chunk_index) unique index instead of scanning skipped rows
+                stmt = stmt.where(
+                    tuple_(Transcript.video_id, Transcript.chunk_index) > (after_video_id, after_chunk_index)
+                )
+            if video_id is not None:
+                stmt = stmt.order_by(Transcript.chunk_index)
+            else:
+                stmt = stmt.order_by(Transcript.video_id, Transcript.chunk_index)
+        if offset is not None:
+            stmt = stmt.offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return [TranscriptRow(*row) for row in db.session.execute(stmt)]
 
     @staticmethod
     def delete_transcript(transcript_id: int) -> bool:
@@ -137,13 +221,10 @@ class TranscriptService:
         Returns:
             bool: True if transcript was deleted, False if transcript not found
         """
-        transcript = TranscriptService.get_transcript_by_id(transcript_id)
-        if not transcript:
-            return False
-        
-        db.session.delete(transcript)
+        result = db.session.execute(delete(Transcript).where(Transcript.id == transcript_id))
         db.session.commit()
-        return True
+        response_cache.invalidate('transcripts')
+        return result.rowcount > 0
 
     @staticmethod
     def transcript_exists(transcript_id: int) -> bool:
@@ -156,7 +237,7 @@ class TranscriptService:
         Returns:
             bool: True if transcript exists, False otherwise
         """
-        return Transcript.query.filter_by(id=transcript_id).first() is not None
+        return db.session.scalar(select(exists().where(Transcript.id == transcript_id)))
 
     @staticmethod
     def get_transcripts_by_video(video_id: int) -> List[Transcript]:
@@ -169,8 +250,35 @@ class TranscriptService:
         Returns:
             List[Transcript]: List of transcript chunks for the video
         """
-        return (
-            Transcript.query.filter_by(video_id=video_id)
+        return db.session.scalars(
+            select(Transcript)
+            .filter_by(video_id=video_id)
+            .order_by(Transcript.chunk_index)
+        ).all()
+
+    @staticmethod
+    def iter_transcripts_by_video(video_id: int, batch_size: int = 500) -> Iterator[TranscriptRow]:
+        """
+        Stream the serialized columns of a video's transcript chunks, ordered by chunk_index.
+        Rows are fetched from the cursor in batches rather than loaded all at once.
+
+        Args:
+            video_id: The ID of the video
+            batch_size: Number of rows fetched from the database per batch
+
+        Returns:
+            Iterator[TranscriptRow]: Rows of id, video_id, content, chunk_index and created_at
+        """
+        stmt = (
+            select(
+                Transcript.id,
+                Transcript.video_id,
+                Transcript.content,
+                Transcript.chunk_index,
+                Transcript.created_at
+            )
+            .filter_by(video_id=video_id)
             .order_by(Transcript.chunk_index)
-            .all()
+            .execution_options(yield_per=batch_size)
         )
+        return (TranscriptRow(*row) for row in db.session.execute(stmt))
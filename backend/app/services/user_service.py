@@ -1,74 +1,175 @@
+import hashlib
+import hmac
+import threading
 from typing import Optional, List
-from werkzeug.security import generate_password_hash, check_password_hash
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
+from flask import current_app
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from werkzeug.security import check_password_hash
 from app import db
-from app.models.models import User
+from app.cache import response_cache
+from app.models.models import Collection, User
+
+# Short-lived cache of users looked up by the auth middleware, keyed by user ID
+_user_cache = TTLCache(maxsize=4096, ttl=60)
+_user_cache_lock = threading.RLock()
+
+# Argon2id hasher for stored passwords; older Werkzeug hashes are upgraded on login
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+# Recent successful logins, keyed by an HMAC of the credentials, mapping to the user ID
+_login_cache = TTLCache(maxsize=4096, ttl=30)
+_login_cache_lock = threading.Lock()
+
+
+def _login_cache_key(username: str, password: str) -> bytes:
+    """Derive the login cache key; the plain password is never stored."""
+    secret = current_app.config['SECRET_KEY'].encode()
+    # JSON-encoded as a pair so no (username, password) split can collide with another
+    return hmac.new(secret, orjson.dumps([username, password]), hashlib.sha256).digest()
+
+
+def _verify_password(user: User, password: str) -> bool:
+    """
+    Check a password against the user's stored hash, upgrading it if needed
+    
+    Legacy Werkzeug (pbkdf2/scrypt) hashes are verified with check_password_hash and
+    replaced with an Argon2 hash on success, as are Argon2 hashes with outdated
+    parameters. The caller is responsible for committing the session.
+    """
+    if user.password.startswith('$argon2'):
+        try:
+            _password_hasher.verify(user.password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if _password_hasher.check_needs_rehash(user.password):
+            user.password = _password_hasher.hash(password)
+        return True
+    
+    if not check_password_hash(user.password, password):
+        return False
+    user.password = _password_hasher.hash(password)
+    return True
 
 
 class UserService:
     @staticmethod
-    def create_user(username: str, password: str) -> User:
+    def create_user(username: str, password: str) -> Optional[User]:
         """
         Create a new user with hashed password
         
+        Uses a single INSERT ... ON CONFLICT DO NOTHING so the uniqueness check
+        and the insert happen in one atomic round-trip.
+        
         Args:
             username: Unique username for the user
             password: Plain text password to be hashed
             
         Returns:
-            User: The created user object
+            User: The created user object, or None if the username already exists
             
         Raises:
             ValueError: If username or password is empty or None
-            IntegrityError: If username already exists
+            IntegrityError: If username is blank (ck_users_username_nonempty)
         """
-        if not username or not username.strip():
+        if not username:
             raise ValueError("Username cannot be empty")
         
         if not password:
             raise ValueError("Password cannot be empty")
         
         # Hash the password before storing
-        hashed_password = generate_password_hash(password)
+        hashed_password = _password_hasher.hash(password)
         
-        user = User(
-            username=username.strip(),
-            password=hashed_password
+        insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+        stmt = (
+            insert(User)
+            .values(username=username.strip(), password=hashed_password)
+            .on_conflict_do_nothing(index_elements=['username'])
+            .returning(User)
         )
-        db.session.add(user)
+        user = db.session.scalars(stmt).first()
         db.session.commit()
         return user
 
     @staticmethod
-    def get_user_by_id(user_id: int) -> Optional[User]:
+    def get_user_by_id(user_id: int, refresh: bool = False) -> Optional[User]:
         """
         Get a user by their ID
         
+        Args:
+            user_id: The ID of the user
+            refresh: Re-read the row even if the user is already in the session
+            
+        Returns:
+            User: The user object if found, None otherwise
+        """
+        return db.session.get(User, user_id, populate_existing=refresh)
+
+    @staticmethod
+    def get_user_by_id_cached(user_id: int) -> Optional[User]:
+        """
+        Get a user by their ID, served from a short-lived in-memory cache
+        
         Args:
             user_id: The ID of the user
             
         Returns:
             User: The user object if found, None otherwise
         """
-        return User.query.get(user_id)
+        with _user_cache_lock:
+            user = _user_cache.get(user_id)
+        if user is not None:
+            # Attach the cached instance to the current session without a SELECT
+            return db.session.merge(user, load=False)
+        
+        user = UserService.get_user_by_id(user_id)
+        if user:
+            with _user_cache_lock:
+                _user_cache[user_id] = user
+        return user
+
+    @staticmethod
+    def invalidate_user_cache(user_id: int) -> None:
+        """
+        Remove a user from the auth lookup cache
+        
+        Args:
+            user_id: The ID of the user to evict
+        """
+        with _user_cache_lock:
+            _user_cache.pop(user_id, None)
 
     @staticmethod
-    def get_all_users(limit: Optional[int] = None, offset: Optional[int] = None) -> List[User]:
+    def get_all_users(
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after_id: Optional[int] = None
+    ) -> List[User]:
         """
         Get all users with optional pagination
         
         Args:
             limit: Maximum number of users to return
-            offset: Number of users to skip
+            offset: Number of users to skip (deprecated, use after_id)
+            after_id: Only return users with an ID greater than this (keyset pagination)
             
         Returns:
             List[User]: List of user objects
         """
-        query = User.query
+        stmt = select(User).order_by(User.id)
+        if after_id is not None:
+            stmt = stmt.where(User.id > after_id)
         if offset is not None:
-            query = query.offset(offset)
+            stmt = stmt.offset(offset)
         if limit is not None:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return db.session.scalars(stmt).all()
 
     @staticmethod
     def delete_user(user_id: int) -> bool:
@@ -81,13 +182,23 @@ class UserService:
         Returns:
             bool: True if user was deleted, False if user not found
         """
-        user = UserService.get_user_by_id(user_id)
-        if not user:
-            return False
+        # Imported here because VideoService depends on this module
+        from app.services.video_service import VideoService
         
-        db.session.delete(user)
+        # Deleted explicitly so their cache entries can be invalidated; collections and
+        # transcripts are removed by the cascade
+        videos = VideoService.delete_videos_in_collections(
+            select(Collection.id).where(Collection.user_id == user_id)
+        )
+        result = db.session.execute(delete(User).where(User.id == user_id))
         db.session.commit()
-        return True
+        # Otherwise this worker keeps accepting the user's tokens until the entry expires
+        UserService.invalidate_user_cache(user_id)
+        # The user's collections are removed by the cascade
+        VideoService.invalidate_collection()
+        VideoService.invalidate_video_cache(videos)
+        response_cache.invalidate('videos', 'transcripts')
+        return result.rowcount > 0
 
     @staticmethod
     def user_exists(user_id: int) -> bool:
@@ -100,7 +211,7 @@ class UserService:
         Returns:
             bool: True if user exists, False otherwise
         """
-        return User.query.filter_by(id=user_id).first() is not None
+        return db.session.scalar(select(exists().where(User.id == user_id)))
 
     @staticmethod
     def username_exists(username: str) -> bool:
@@ -113,7 +224,7 @@ class UserService:
         Returns:
             bool: True if username exists, False otherwise
         """
-        return User.query.filter_by(username=username).first() is not None
+        return db.session.scalar(select(exists().where(User.username == username)))
 
     @staticmethod
     def get_user_by_username(username: str) -> Optional[User]:
@@ -126,13 +237,16 @@ class UserService:
         Returns:
             User: The user object if found, None otherwise
         """
-        return User.query.filter_by(username=username).first()
+        return db.session.scalars(select(User).filter_by(username=username)).first()
 
     @staticmethod
     def login(username: str, password: str) -> Optional[User]:
         """
         Authenticate a user by username and password
         
+        Successful logins are remembered for a short time so that repeated
+        logins with the same credentials skip the password hash check.
+        
         Args:
             username: The username to authenticate
             password: The plain text password to verify
@@ -143,11 +257,23 @@ class UserService:
         if not username or not password:
             return None
         
+        key = _login_cache_key(username, password)
+        with _login_cache_lock:
+            user_id = _login_cache.get(key)
+        if user_id is not None:
+            user = UserService.get_user_by_id(user_id)
+            if user and user.username == username:
+                return user
+        
         user = UserService.get_user_by_username(username)
         if not user:
             return None
         
-        if not check_password_hash(user.password, password):
+        if not _verify_password(user, password):
             return None
+        if db.session.is_modified(user):
+            db.session.commit()
         
+        with _login_cache_lock:
+            _login_cache[key] = user.id
         return user
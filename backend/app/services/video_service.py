@@ -1,9 +1,66 @@
-from typing import Optional, List
+import threading
+from typing import Optional, List, Dict, Iterable, Iterator, Mapping
+from cachetools import TTLCache
+from sqlalchemy import Row, RowMapping, bindparam, delete, exists, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from app import db
+from app.cache import response_cache, video_cache
+from app.errors import is_foreign_key_violation
 from app.models.models import Video
 from app.services.collection_service import CollectionService
 from youtube_transcript_api import YouTubeTranscriptApi
 
+# Collections recently confirmed to exist, so batches of video writes into the same
+# collection skip the existence SELECT; only positive results are cached
+_collection_exists_cache = TTLCache(maxsize=1024, ttl=60)
+_collection_exists_cache_lock = threading.Lock()
+
+# Serialized columns of a video, selected or returned without hydrating ORM objects
+_VIDEO_COLUMNS = (
+    Video.id,
+    Video.youtube_id,
+    Video.title,
+    Video.description,
+    Video.collection_id,
+    Video.created_at
+)
+_VIDEO_KEYS = tuple(column.key for column in _VIDEO_COLUMNS)
+
+# Hot lookups built once and executed with bound parameters, so every call hits
+# the compiled statement cache without rebuilding the statement
+_VIDEO_DATA_BY_ID = select(*_VIDEO_COLUMNS).where(Video.id == bindparam('video_id'))
+_VIDEO_DATA_BY_YOUTUBE_ID = select(*_VIDEO_COLUMNS).where(Video.youtube_id == bindparam('youtube_id'))
+# Eager loads applied by every read that returns Video objects. Use selectinload, not
+# joinedload: it costs one extra IN query instead of multiplying rows per relationship
+DEFAULT_LOAD_OPTIONS = (selectinload(Video.collection),)
+
+# IDs per IN (...) query; stays under SQLite's default 999 bound-parameter limit
+_IN_CHUNK_SIZE = 900
+
+_VIDEO_BY_YOUTUBE_ID = (
+    select(Video)
+    .where(Video.youtube_id == bindparam('youtube_id'))
+    .options(*DEFAULT_LOAD_OPTIONS)
+)
+_VIDEOS_BY_COLLECTION = (
+    select(Video)
+    .where(Video.collection_id == bindparam('collection_id'))
+    .options(*DEFAULT_LOAD_OPTIONS)
+)
+
+# Columns of the lightweight video listing
+_VIDEO_LITE_COLUMNS = (Video.id, Video.youtube_id, Video.title)
+
+
+
+def _video_cache_key_by_id(video_id: int) -> str:
+    return video_cache.key('video', f'id:{video_id}')
+
+
+def _video_cache_key_by_youtube_id(youtube_id: str) -> str:
+    return video_cache.key('video', f'yt:{youtube_id}')
+
 
 class VideoService:
     @staticmethod
@@ -12,7 +69,7 @@ class VideoService:
         title: str,
         collection_id: int,
         description: Optional[str] = None
-    ) -> Video:
+    ) -> Row:
         """
         Create a new video
         
@@ -23,29 +80,120 @@ class VideoService:
             description: Optional description of the video
             
         Returns:
-            Video: The created video object
+            Row: The created video's id, youtube_id, title, description, collection_id
+                 and created_at
             
         Raises:
-            ValueError: If required fields are empty or collection doesn't exist
+            ValueError: If required fields are blank or collection doesn't exist
+            IntegrityError: If youtube_id is taken
         """
-        if not youtube_id or not youtube_id.strip():
-            raise ValueError("YouTube ID cannot be empty")
+        return VideoService.bulk_create_videos(collection_id, [{
+            'youtube_id': youtube_id,
+            'title': title,
+            'description': description
+        }])[0]
+
+    @staticmethod
+    def bulk_create_videos(collection_id: int, videos: Iterable[Mapping]) -> List[Row]:
+        """
+        Create several videos in one collection with a single INSERT in one transaction
         
-        if not title or not title.strip():
-            raise ValueError("Video title cannot be empty")
+        All rows are validated with Video.clean_values before anything is written,
+        and the collection is checked once for the whole batch.
         
-        if not CollectionService.collection_exists(collection_id):
+        Args:
+            collection_id: ID of the collection the videos belong to
+            videos: Mappings with youtube_id, title and optional description
+            
+        Returns:
+            List[Row]: The created videos' id, youtube_id, title, description,
+                       collection_id and created_at, in input order
+            
+        Raises:
+            ValueError: If required fields are blank or collection doesn't exist
+            IntegrityError: If a youtube_id is taken
+        """
+        rows = []
+        for video in videos:
+            row = Video.clean_values({
+                'youtube_id': video.get('youtube_id'),
+                'title': video.get('title'),
+                'description': video.get('description')
+            })
+            row['collection_id'] = collection_id
+            rows.append(row)
+        if not rows:
+            return []
+        
+        if not VideoService._collection_exists_cached(collection_id):
             raise ValueError(f"Collection with ID {collection_id} does not exist")
         
-        video = Video(
-            youtube_id=youtube_id.strip(),
-            title=title.strip(),
-            collection_id=collection_id,
-            description=description.strip() if description else None
-        )
-        db.session.add(video)
-        db.session.commit()
-        return video
+        # Without sort_by_parameter_order SQLite sends one multi-row INSERT instead of one
+        # per video; the RETURNING rows are put back in input order by their unique youtube_id
+        stmt = insert(Video).returning(*_VIDEO_COLUMNS)
+        try:
+            created = {row.youtube_id: row for row in db.session.execute(stmt, rows)}
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            VideoService._raise_if_collection_missing(e, collection_id)
+            raise
+        response_cache.invalidate('videos')
+        return [created[row['youtube_id']] for row in rows]
+
+    @staticmethod
+    def _collection_exists_cached(collection_id: int) -> bool:
+        """
+        Check if a collection exists, remembering positive answers for a short time
+        
+        Args:
+            collection_id: The ID of the collection to check
+            
+        Returns:
+            bool: True if collection exists, False otherwise
+        """
+        with _collection_exists_cache_lock:
+            if collection_id in _collection_exists_cache:
+                return True
+        
+        if not CollectionService.collection_exists(collection_id):
+            return False
+        with _collection_exists_cache_lock:
+            _collection_exists_cache[collection_id] = True
+        return True
+
+    @staticmethod
+    def _raise_if_collection_missing(e: IntegrityError, collection_id: int) -> None:
+        """
+        Turn a FOREIGN KEY violation on collection_id into the ValueError callers expect
+        
+        The cached existence check can be stale when the collection was deleted by
+        another worker, so the database has the final say; the stale entry is dropped.
+        
+        Args:
+            e: The IntegrityError raised by the write, after the session was rolled back
+            collection_id: The collection the write referenced
+            
+        Raises:
+            ValueError: If e is a FOREIGN KEY violation
+        """
+        if is_foreign_key_violation(e):
+            VideoService.invalidate_collection(collection_id)
+            raise ValueError(f"Collection with ID {collection_id} does not exist") from e
+
+    @staticmethod
+    def invalidate_collection(collection_id: Optional[int] = None) -> None:
+        """
+        Forget a collection's cached existence check
+        
+        Args:
+            collection_id: The ID of the deleted collection, or None to forget all of them
+        """
+        with _collection_exists_cache_lock:
+            if collection_id is None:
+                _collection_exists_cache.clear()
+            else:
+                _collection_exists_cache.pop(collection_id, None)
 
     @staticmethod
     def get_video_by_id(video_id: int) -> Optional[Video]:
@@ -58,13 +206,88 @@ class VideoService:
         Returns:
             Video: The video object if found, None otherwise
         """
-        return Video.query.get(video_id)
+        return db.session.get(Video, video_id, options=DEFAULT_LOAD_OPTIONS)
+
+    @staticmethod
+    def _load_video_data(stmt, params: dict) -> Optional[dict]:
+        row = db.session.execute(stmt, params).first()
+        return dict(zip(_VIDEO_KEYS, row)) if row is not None else None
+
+    @staticmethod
+    def get_video_by_id_cached(video_id: int) -> Optional[dict]:
+        """
+        Get a serialized video by its ID, served from the video cache (Redis when configured)
+        
+        Args:
+            video_id: The ID of the video
+            
+        Returns:
+            dict: The video's id, youtube_id, title, description, collection_id and
+                  created_at (as an ISO string) if found, None otherwise
+        """
+        return video_cache.get_or_set(
+            _video_cache_key_by_id(video_id),
+            lambda: VideoService._load_video_data(_VIDEO_DATA_BY_ID, {'video_id': video_id})
+        )
+
+    @staticmethod
+    def get_video_by_youtube_id_cached(youtube_id: str) -> Optional[dict]:
+        """
+        Get a serialized video by its YouTube ID, served from the video cache (Redis when configured)
+        
+        Args:
+            youtube_id: The YouTube ID of the video
+            
+        Returns:
+            dict: The video's id, youtube_id, title, description, collection_id and
+                  created_at (as an ISO string) if found, None otherwise
+        """
+        return video_cache.get_or_set(
+            _video_cache_key_by_youtube_id(youtube_id),
+            lambda: VideoService._load_video_data(_VIDEO_DATA_BY_YOUTUBE_ID, {'youtube_id': youtube_id})
+        )
+
+    @staticmethod
+    def invalidate_video_cache(videos: Iterable[Row]) -> None:
+        """
+        Invalidate the cached entries of the given videos, by ID and by YouTube ID
+        
+        Args:
+            videos: Rows with the id and youtube_id of each updated or deleted video
+        """
+        video_cache.delete(*(
+            key
+            for video in videos
+            for key in (_video_cache_key_by_id(video.id), _video_cache_key_by_youtube_id(video.youtube_id))
+        ))
+
+    @staticmethod
+    def delete_videos_in_collections(collection_ids) -> List[Row]:
+        """
+        Delete the videos of the given collections, without committing
+        
+        Used before deleting collections (or their user) so the deleted videos are
+        known and their cache entries can be invalidated; the database cascade would
+        remove them without saying which ones went.
+        
+        Args:
+            collection_ids: A list of collection IDs, or a SELECT of them
+            
+        Returns:
+            List[Row]: The deleted videos' id and youtube_id
+        """
+        return db.session.execute(
+            delete(Video)
+            .where(Video.collection_id.in_(collection_ids))
+            .returning(Video.id, Video.youtube_id)
+        ).all()
 
     @staticmethod
     def get_all_videos(
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-        collection_id: Optional[int] = None
+        collection_id: Optional[int] = None,
+        eager: bool = True
     ) -> List[Video]:
         """
         Get all videos with optional pagination and collection filtering
@@ -73,18 +296,73 @@ class VideoService:
             limit: Maximum number of videos to return
             offset: Number of videos to skip
             collection_id: Optional collection ID to filter videos by collection
+            eager: Apply DEFAULT_LOAD_OPTIONS; pass False to skip the extra IN query
             
         Returns:
             List[Video]: List of video objects
         """
-        query = Video.query
+        stmt = select(Video)
+        if eager:
+            stmt = stmt.options(*DEFAULT_LOAD_OPTIONS)
+        if collection_id is not None:
+            stmt = stmt.filter_by(collection_id=collection_id)
+        if offset is not None:
+            stmt = stmt.offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.session.scalars(stmt).all()
+
+    @staticmethod
+    def get_all_videos_raw(
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        collection_id: Optional[int] = None
+    ) -> List[Row]:
+        """
+        Get the serialized columns of all videos without hydrating ORM objects
+        
+        Args:
+            limit: Maximum number of videos to return
+            offset: Number of videos to skip
+            collection_id: Optional collection ID to filter videos by collection
+            
+        Returns:
+            List[Row]: Rows of id, youtube_id, title, description, collection_id and created_at
+        """
+        stmt = select(*_VIDEO_COLUMNS).order_by(Video.id)
         if collection_id is not None:
-            query = query.filter_by(collection_id=collection_id)
+            stmt = stmt.filter_by(collection_id=collection_id)
         if offset is not None:
-            query = query.offset(offset)
+            stmt = stmt.offset(offset)
         if limit is not None:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return db.session.execute(stmt).all()
+
+    @staticmethod
+    def list_videos_lite(
+        collection_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None
+    ) -> List[RowMapping]:
+        """
+        Get just the id, youtube_id and title of all videos, for listings
+        
+        Args:
+            collection_id: Optional collection ID to filter videos by collection
+            limit: Maximum number of videos to return
+            offset: Number of videos to skip
+            
+        Returns:
+            List[RowMapping]: Mappings of id, youtube_id and title
+        """
+        stmt = select(*_VIDEO_LITE_COLUMNS).order_by(Video.id)
+        if collection_id is not None:
+            stmt = stmt.filter_by(collection_id=collection_id)
+        if offset is not None:
+            stmt = stmt.offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.session.execute(stmt).mappings().all()
 
     @staticmethod
     def update_video(
@@ -92,10 +370,14 @@ class VideoService:
         title: Optional[str] = None,
         description: Optional[str] = None,
         collection_id: Optional[int] = None
-    ) -> Optional[Video]:
+    ) -> Optional[Row]:
         """
         Update a video by its ID
         
+        The changes are applied with a single UPDATE ... RETURNING, so the video is
+        never loaded into the session first. The UPDATE only matches if some value
+        actually differs; otherwise nothing is committed and the caches are kept.
+        
         Args:
             video_id: The ID of the video to update
             title: Optional new title for the video
@@ -103,29 +385,51 @@ class VideoService:
             collection_id: Optional new collection ID for the video
             
         Returns:
-            Video: The updated video object if found, None otherwise
+            Row: The updated id, youtube_id, title, description, collection_id and
+                 created_at if the video was found, None otherwise
             
         Raises:
-            ValueError: If collection_id is provided but doesn't exist
+            ValueError: If title is blank, or collection_id is provided but doesn't exist
         """
-        video = VideoService.get_video_by_id(video_id)
-        if not video:
-            return None
+        values = {}
+        if title is not None:
+            values['title'] = title
+        
+        if description is not None:
+            values['description'] = description
+        values = Video.clean_values(values)
         
         if collection_id is not None:
-            if not CollectionService.collection_exists(collection_id):
+            if not VideoService._collection_exists_cached(collection_id):
                 raise ValueError(f"Collection with ID {collection_id} does not exist")
-            video.collection_id = collection_id
+            values['collection_id'] = collection_id
         
-        if title is not None:
-            if not title.strip():
-                raise ValueError("Video title cannot be empty")
-            video.title = title.strip()
+        current = select(*_VIDEO_COLUMNS).where(Video.id == video_id)
+        if not values:
+            return db.session.execute(current).first()
         
-        if description is not None:
-            video.description = description.strip() if description.strip() else None
+        stmt = (
+            update(Video)
+            .where(Video.id == video_id)
+            .where(or_(*(getattr(Video, name).is_distinct_from(value) for name, value in values.items())))
+            .values(**values)
+            .returning(*_VIDEO_COLUMNS)
+        )
+        try:
+            video = db.session.execute(stmt).first()
+            if video is None:
+                # Either the video doesn't exist or nothing changed; no-op updates aren't committed
+                db.session.rollback()
+                return db.session.execute(current).first()
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if collection_id is not None:
+                VideoService._raise_if_collection_missing(e, collection_id)
+            raise
         
-        db.session.commit()
+        VideoService.invalidate_video_cache([video])
+        response_cache.invalidate('videos')
         return video
 
     @staticmethod
@@ -139,12 +443,15 @@ class VideoService:
         Returns:
             bool: True if video was deleted, False if video not found
         """
-        video = VideoService.get_video_by_id(video_id)
-        if not video:
-            return False
-        
-        db.session.delete(video)
+        deleted = db.session.execute(
+            delete(Video).where(Video.id == video_id).returning(Video.id, Video.youtube_id)
+        ).first()
         db.session.commit()
+        if deleted is None:
+            return False
+        VideoService.invalidate_video_cache([deleted])
+        # Transcripts of the video are removed by the cascade
+        response_cache.invalidate('videos', 'transcripts')
         return True
 
     @staticmethod
@@ -152,31 +459,62 @@ class VideoService:
         """
         Check if a video exists by ID
         
+        Don't call this before update_video or delete_video: both detect a missing
+        video from their own RETURNING result (None / False), so a pre-check only
+        adds a round-trip and can race with a concurrent delete.
+        
         Args:
             video_id: The ID of the video to check
             
         Returns:
             bool: True if video exists, False otherwise
         """
-        return Video.query.filter_by(id=video_id).first() is not None
+        return db.session.scalar(select(exists().where(Video.id == video_id)))
 
     @staticmethod
     def get_videos_by_collection(collection_id: int) -> List[Video]:
         """
         Get all videos for a specific collection
         
+        The collection is eager-loaded in one batched IN query, so touching
+        video.collection doesn't issue a SELECT per video.
+        
         Args:
             collection_id: The ID of the collection
             
         Returns:
             List[Video]: List of video objects for the collection
         """
-        return Video.query.filter_by(collection_id=collection_id).all()
+        return db.session.scalars(_VIDEOS_BY_COLLECTION, {'collection_id': collection_id}).all()
+
+    @staticmethod
+    def iter_videos_by_collection(collection_id: int, batch_size: int = 500) -> Iterator[Row]:
+        """
+        Stream the serialized columns of a collection's videos, ordered by ID.
+        Rows are fetched from the cursor in batches rather than loaded all at once.
+        
+        Args:
+            collection_id: The ID of the collection
+            batch_size: Number of rows fetched from the database per batch
+            
+        Returns:
+            Iterator[Row]: Rows of id, youtube_id, title, description, collection_id and created_at
+        """
+        stmt = (
+            select(*_VIDEO_COLUMNS)
+            .filter_by(collection_id=collection_id)
+            .order_by(Video.id)
+            .execution_options(yield_per=batch_size)
+        )
+        return iter(db.session.execute(stmt))
 
     @staticmethod
     def get_video_by_youtube_id(youtube_id: str) -> Optional[Video]:
         """
-        Get a video by its YouTube ID
+        Get a video by its YouTube ID as an ORM object
+        
+        Read-only lookups should use get_video_by_youtube_id_cached instead, which
+        skips the database on a cache hit.
         
         Args:
             youtube_id: The YouTube ID of the video
@@ -184,7 +522,49 @@ class VideoService:
         Returns:
             Video: The video object if found, None otherwise
         """
-        return Video.query.filter_by(youtube_id=youtube_id).first()
+        return db.session.scalars(_VIDEO_BY_YOUTUBE_ID, {'youtube_id': youtube_id}).first()
+
+    @staticmethod
+    def _get_videos_in(column, values: Iterable) -> List[Video]:
+        values = list(dict.fromkeys(values))
+        videos = []
+        for start in range(0, len(values), _IN_CHUNK_SIZE):
+            stmt = (
+                select(Video)
+                .where(column.in_(values[start:start + _IN_CHUNK_SIZE]))
+                .options(*DEFAULT_LOAD_OPTIONS)
+            )
+            videos.extend(db.session.scalars(stmt))
+        return videos
+
+    @staticmethod
+    def get_videos_by_ids(video_ids: Iterable[int]) -> Dict[int, Video]:
+        """
+        Get many videos by ID with one IN query per 900 IDs, instead of one query per video
+        
+        Args:
+            video_ids: The IDs of the videos; duplicates are ignored
+            
+        Returns:
+            Dict[int, Video]: Video objects keyed by ID; missing IDs are absent
+        """
+        return {video.id: video for video in VideoService._get_videos_in(Video.id, video_ids)}
+
+    @staticmethod
+    def get_videos_by_youtube_ids(youtube_ids: Iterable[str]) -> Dict[str, Video]:
+        """
+        Get many videos by YouTube ID with one IN query per 900 IDs, instead of one query per video
+        
+        Args:
+            youtube_ids: The YouTube IDs of the videos; duplicates are ignored
+            
+        Returns:
+            Dict[str, Video]: Video objects keyed by YouTube ID; missing IDs are absent
+        """
+        return {
+            video.youtube_id: video
+            for video in VideoService._get_videos_in(Video.youtube_id, youtube_ids)
+        }
 
     @staticmethod
     def get_video_transcript(youtube_id: str) -> Optional[str]:
@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration for production deployments:
+
+    gunicorn -c gunicorn_conf.py run:app
+
+The app runs with ProductionConfig unless FLASK_ENV is set; don't set
+FLASK_ENV=development here, which turns on DEBUG and query recording.
+
+Each worker process gets its own connection pool, so keep
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) within the database's connection limit.
+For gevent workers use wsgi:app instead, which patches blocking I/O first.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2 * multiprocessing.cpu_count() + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Keep at or below DB_POOL_SIZE so threads in a worker never wait on the pool
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Connections inherited from the master must not be shared across processes
+    from app import db
+
+    # The application gunicorn loaded, whichever module (run:app, wsgi:app) it came from
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,232 @@
+"""Constraints, cascades, indexes and token revocation
+
+- users: token_version column, password widened to 255 for Argon2 hashes,
+  username uniqueness moved to the ix_users_username unique index, non-blank CHECK
+- revoked_tokens table
+- collections/videos/transcripts: foreign keys with ON DELETE CASCADE,
+  non-blank CHECK constraints and foreign key indexes
+- videos: uq_videos_youtube_id and ix_videos_collection_id_id
+- transcripts: uq_transcripts_video_id_chunk_index (required by the transcript upsert)
+
+SQLite can't alter constraints in place, so each table is rebuilt from its new
+definition and the existing rows are copied over. Postgres is altered in place, with
+indexes built CONCURRENTLY.
+
+Revision ID: 0002_constraints_indexes_tokens
+Revises: 0001_baseline
+Create Date: 2026-10-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_constraints_indexes_tokens'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def _target_tables(metadata):
+    """The tables as of this revision, independent of later model changes"""
+    users = sa.Table(
+        'users', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'),
+        sa.CheckConstraint('length(trim(username)) > 0', name='ck_users_username_nonempty'),
+        sa.Index('ix_users_username', 'username', unique=True),
+    )
+    collections = sa.Table(
+        'collections', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(length=120), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.CheckConstraint('length(trim(name)) > 0', name='ck_collections_name_nonempty'),
+        sa.Index('ix_collections_user_id', 'user_id'),
+    )
+    videos = sa.Table(
+        'videos', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('youtube_id', sa.String(length=32), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('collection_id', sa.Integer(), sa.ForeignKey('collections.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.CheckConstraint('length(trim(youtube_id)) > 0', name='ck_videos_youtube_id_nonempty'),
+        sa.CheckConstraint('length(trim(title)) > 0', name='ck_videos_title_nonempty'),
+        sa.UniqueConstraint('youtube_id', name='uq_videos_youtube_id'),
+        sa.Index('ix_videos_collection_id_id', 'collection_id', 'id'),
+    )
+    transcripts = sa.Table(
+        'transcripts', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('video_id', sa.Integer(), sa.ForeignKey('videos.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('chunk_index', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.CheckConstraint('length(trim(content)) > 0', name='ck_transcripts_content_nonempty'),
+        sa.UniqueConstraint('video_id', 'chunk_index', name='uq_transcripts_video_id_chunk_index'),
+        sa.Index('ix_transcripts_video_id', 'video_id'),
+    )
+    return users, collections, videos, transcripts
+
+
+def _baseline_tables(metadata):
+    """The tables as of 0001_baseline"""
+    users = sa.Table(
+        'users', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('username', sa.String(length=80), nullable=False, unique=True),
+        sa.Column('password', sa.String(length=120), nullable=False),
+    )
+    collections = sa.Table(
+        'collections', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(length=120), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    videos = sa.Table(
+        'videos', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('youtube_id', sa.String(length=32), nullable=False, unique=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('collection_id', sa.Integer(), sa.ForeignKey('collections.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    transcripts = sa.Table(
+        'transcripts', metadata,
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('video_id', sa.Integer(), sa.ForeignKey('videos.id'), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('chunk_index', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    return users, collections, videos, transcripts
+
+
+def _rebuild_sqlite_table(table):
+    """
+    Replace a SQLite table with the given definition, copying the rows of every column
+    the old and new tables share; columns new to the table take their server default
+    """
+    bind = op.get_bind()
+    old_columns = {column['name'] for column in sa.inspect(bind).get_columns(table.name)}
+    columns = ', '.join(column.name for column in table.columns if column.name in old_columns)
+
+    tmp = table.to_metadata(table.metadata, name=f'_tmp_{table.name}')
+    op.execute(sa.schema.CreateTable(tmp))
+    op.execute(f'INSERT INTO {tmp.name} ({columns}) SELECT {columns} FROM {table.name}')
+    op.execute(f'DROP TABLE {table.name}')
+    op.execute(f'ALTER TABLE {tmp.name} RENAME TO {table.name}')
+    for index in table.indexes:
+        index.create(bind)
+    table.metadata.remove(tmp)
+
+
+def _delete_duplicate_transcript_chunks():
+    # Keep the newest row of any (video_id, chunk_index) left by concurrent writes
+    op.execute(
+        'DELETE FROM transcripts WHERE id NOT IN '
+        '(SELECT MAX(id) FROM transcripts GROUP BY video_id, chunk_index)'
+    )
+
+
+def _create_revoked_tokens():
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_revoked_tokens_jti', 'revoked_tokens', ['jti'], unique=True)
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+
+
+def upgrade():
+    bind = op.get_bind()
+    _delete_duplicate_transcript_chunks()
+    if not sa.inspect(bind).has_table('revoked_tokens'):
+        _create_revoked_tokens()
+
+    if bind.dialect.name == 'sqlite':
+        # Safe to re-run over a schema that is already partly or fully current
+        for table in _target_tables(sa.MetaData()):
+            _rebuild_sqlite_table(table)
+        return
+
+    # Postgres: baseline constraints carry the server's default names
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+    op.alter_column('users', 'password', type_=sa.String(length=255), existing_nullable=False)
+    op.drop_constraint('users_username_key', 'users', type_='unique')
+    op.create_check_constraint('ck_users_username_nonempty', 'users', 'length(trim(username)) > 0')
+
+    op.drop_constraint('collections_user_id_fkey', 'collections', type_='foreignkey')
+    op.create_foreign_key('collections_user_id_fkey', 'collections', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_check_constraint('ck_collections_name_nonempty', 'collections', 'length(trim(name)) > 0')
+
+    op.drop_constraint('videos_collection_id_fkey', 'videos', type_='foreignkey')
+    op.create_foreign_key('videos_collection_id_fkey', 'videos', 'collections', ['collection_id'], ['id'], ondelete='CASCADE')
+    op.drop_constraint('videos_youtube_id_key', 'videos', type_='unique')
+    op.create_unique_constraint('uq_videos_youtube_id', 'videos', ['youtube_id'])
+    op.create_check_constraint('ck_videos_youtube_id_nonempty', 'videos', 'length(trim(youtube_id)) > 0')
+    op.create_check_constraint('ck_videos_title_nonempty', 'videos', 'length(trim(title)) > 0')
+
+    op.drop_constraint('transcripts_video_id_fkey', 'transcripts', type_='foreignkey')
+    op.create_foreign_key('transcripts_video_id_fkey', 'transcripts', 'videos', ['video_id'], ['id'], ondelete='CASCADE')
+    op.create_unique_constraint('uq_transcripts_video_id_chunk_index', 'transcripts', ['video_id', 'chunk_index'])
+    op.create_check_constraint('ck_transcripts_content_nonempty', 'transcripts', 'length(trim(content)) > 0')
+
+    # CONCURRENTLY can't run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_username', 'users', ['username'], unique=True, postgresql_concurrently=True)
+        op.create_index('ix_collections_user_id', 'collections', ['user_id'], postgresql_concurrently=True)
+        op.create_index('ix_videos_collection_id_id', 'videos', ['collection_id', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_transcripts_video_id', 'transcripts', ['video_id'], postgresql_concurrently=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_index('ix_revoked_tokens_jti', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
+
+    if bind.dialect.name == 'sqlite':
+        for table in _baseline_tables(sa.MetaData()):
+            _rebuild_sqlite_table(table)
+        return
+
+    op.drop_index('ix_transcripts_video_id', table_name='transcripts')
+    op.drop_index('ix_videos_collection_id_id', table_name='videos')
+    op.drop_index('ix_collections_user_id', table_name='collections')
+    op.drop_index('ix_users_username', table_name='users')
+
+    op.drop_constraint('ck_transcripts_content_nonempty', 'transcripts', type_='check')
+    op.drop_constraint('uq_transcripts_video_id_chunk_index', 'transcripts', type_='unique')
+    op.drop_constraint('transcripts_video_id_fkey', 'transcripts', type_='foreignkey')
+    op.create_foreign_key('transcripts_video_id_fkey', 'transcripts', 'videos', ['video_id'], ['id'])
+
+    op.drop_constraint('ck_videos_title_nonempty', 'videos', type_='check')
+    op.drop_constraint('ck_videos_youtube_id_nonempty', 'videos', type_='check')
+    op.drop_constraint('uq_videos_youtube_id', 'videos', type_='unique')
+    op.create_unique_constraint('videos_youtube_id_key', 'videos', ['youtube_id'])
+    op.drop_constraint('videos_collection_id_fkey', 'videos', type_='foreignkey')
+    op.create_foreign_key('videos_collection_id_fkey', 'videos', 'collections', ['collection_id'], ['id'])
+
+    op.drop_constraint('ck_collections_name_nonempty', 'collections', type_='check')
+    op.drop_constraint('collections_user_id_fkey', 'collections', type_='foreignkey')
+    op.create_foreign_key('collections_user_id_fkey', 'collections', 'users', ['user_id'], ['id'])
+
+    op.drop_constraint('ck_users_username_nonempty', 'users', type_='check')
+    op.create_unique_constraint('users_username_key', 'users', ['username'])
+    op.alter_column('users', 'password', type_=sa.String(length=120), existing_nullable=False)
+    op.drop_column('users', 'token_version')
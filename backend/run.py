@@ -2,8 +2,22 @@ from app import create_app
 from app.config import config
 import os
 
-app = create_app(config.get(os.environ.get('FLASK_ENV', 'default')))
+# Connection pool tuning (see app.config.get_engine_options):
+#   DB_POOL_SIZE      persistent connections per process (default 10)
+#   DB_MAX_OVERFLOW   extra connections opened under burst load (default 20)
+#   DB_POOL_TIMEOUT   seconds to wait for a free connection before failing (default 30)
+#   DB_POOL_RECYCLE   seconds before a connection is replaced (default 1800)
+#   DB_POOLCLASS=null disable pooling, e.g. on serverless deployments
+
+# Production unless FLASK_ENV says otherwise; development enables DEBUG and query recording
+app = create_app(config.get(os.environ.get('FLASK_ENV', 'production')))
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The Flask server is for development only; in production run
+    #   gunicorn -c gunicorn_conf.py run:app
+    if os.environ.get('FLASK_ENV') == 'development':
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        raise SystemExit('Set FLASK_ENV=development to use the Flask dev server, '
+                         'or run: gunicorn -c gunicorn_conf.py run:app')
 
@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.cache import response_cache, video_cache
+from app.config import TestingConfig
+from app.middleware import auth
+from app.services import token_service, user_service, video_service
+
+
+@contextmanager
+def count_queries(budget: Optional[int] = None) -> Iterator[List[str]]:
+    """
+    Record the SQL statements the current thread executes inside the block
+
+    Used to catch N+1 regressions, e.g.:
+
+        with count_queries(budget=2) as queries:
+            VideoService.get_videos_by_collection(collection_id)
+
+    Must be used inside an app context. Statements from other threads sharing the
+    engine are ignored.
+
+    Args:
+        budget: Optional maximum number of statements; exceeding it raises on exit
+
+    Yields:
+        List[str]: The statements executed so far, in order
+
+    Raises:
+        AssertionError: If budget is given and more statements were executed
+    """
+    engine = db.engine
+    thread_id = threading.get_ident()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread_id:
+            statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    if budget is not None and len(statements) > budget:
+        raise AssertionError(
+            f'Expected at most {budget} queries, got {len(statements)}:\n' + '\n'.join(statements)
+        )
+
+
+@pytest.fixture(scope='session')
+def app():
+    # The api blueprint can only be set up once, so the app is shared by all tests
+    return create_app(TestingConfig)
+
+
+@pytest.fixture
+def app_context(app):
+    """An app context over a fresh in-memory database and empty caches"""
+    with app.app_context():
+        db.create_all()
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.drop_all()
+            _reset_process_caches(app)
+
+
+def _reset_process_caches(app):
+    """Forget everything cached per process, since IDs are reused by the next test"""
+    response_cache.invalidate('videos', 'transcripts')
+    # Starts over with an empty local cache
+    video_cache.init_app(app)
+    video_service.VideoService.invalidate_collection()
+    user_service._user_cache.clear()
+    user_service._login_cache.clear()
+    auth._verified_tokens.clear()
+    token_service._revoked_jtis.clear()
+    token_service._last_refresh = float('-inf')
+
+
+@pytest.fixture
+def client(app_context):
+    return app_context.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization headers for a freshly registered user (ID 1)"""
+    client.post('/api/users', json={'username': 'alice', 'password': 'secret'})
+    token = client.post('/api/login', json={'username': 'alice', 'password': 'secret'}).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def query_counter(app_context):
+    """The count_queries context manager, e.g. `with query_counter(budget=2) as q:`"""
+    return count_queries
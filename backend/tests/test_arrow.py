@@ -0,0 +1,62 @@
+import pyarrow as pa
+import pytest
+from app.arrow import ARROW_STREAM_MIMETYPE
+
+ARROW = {'Accept': ARROW_STREAM_MIMETYPE}
+# Long enough to be split into two chunks
+CONTENT = ' '.join(['word'] * 3000)
+
+
+@pytest.fixture
+def videos(client, auth_headers):
+    """Two videos; the first has a transcript of two chunks"""
+    client.post('/api/collections', json={'name': 'Collection', 'user_id': 1}, headers=auth_headers)
+    for youtube_id in ('yt-1', 'yt-2'):
+        client.post(
+            '/api/videos',
+            json={'youtube_id': youtube_id, 'title': f'Video {youtube_id}', 'collection_id': 1},
+            headers=auth_headers
+        )
+    client.post('/api/transcripts', json={'video_id': 1, 'content': CONTENT}, headers=auth_headers)
+
+
+def _read_table(response) -> pa.Table:
+    assert response.status_code == 200
+    assert response.mimetype == ARROW_STREAM_MIMETYPE
+    return pa.ipc.open_stream(response.data).read_all()
+
+
+def test_videos_as_arrow_stream(client, auth_headers, videos):
+    table = _read_table(client.get('/api/videos', headers={**auth_headers, **ARROW}))
+    expected = client.get('/api/videos', headers=auth_headers).get_json()['videos']
+
+    assert table.column_names == list(expected[0])
+    assert table.column('youtube_id').to_pylist() == ['yt-1', 'yt-2']
+    assert table.column('title').to_pylist() == [video['title'] for video in expected]
+
+
+def test_lite_videos_as_arrow_stream(client, auth_headers, videos):
+    table = _read_table(client.get('/api/videos?fields=lite', headers={**auth_headers, **ARROW}))
+
+    assert table.column_names == ['id', 'youtube_id', 'title']
+    assert table.num_rows == 2
+
+
+def test_transcripts_as_arrow_stream(client, auth_headers, videos):
+    response = client.get('/api/transcripts?limit=1', headers={**auth_headers, **ARROW})
+    table = _read_table(response)
+
+    assert table.column_names == ['id', 'video_id', 'content', 'chunk_index', 'created_at']
+    assert table.column('chunk_index').to_pylist() == [0]
+    assert response.headers['X-Next-Cursor'] == '1:0'
+
+    table = _read_table(client.get('/api/transcripts?after_video_id=1&after_chunk_index=0',
+                                   headers={**auth_headers, **ARROW}))
+    assert table.column('video_id').to_pylist() == [1]
+    assert table.column('chunk_index').to_pylist() == [1]
+
+
+def test_json_stays_the_default(client, auth_headers, videos):
+    response = client.get('/api/videos', headers={**auth_headers, 'Accept': '*/*'})
+
+    assert response.mimetype == 'application/json'
@@ -0,0 +1,117 @@
+import time
+from datetime import datetime, timedelta, timezone
+from flask_jwt_extended import create_access_token, create_refresh_token
+from werkzeug.security import generate_password_hash
+from app import db
+from app.middleware import auth
+from app.models.models import RevokedToken, User
+from app.services import token_service
+from app.services.user_service import UserService
+
+
+def _token_key(headers):
+    token = headers['Authorization'][len('Bearer '):]
+    return auth.hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _get_users(client, headers):
+    return client.get('/api/users', headers=headers)
+
+
+def test_cached_token_is_accepted(client, auth_headers):
+    assert _get_users(client, auth_headers).status_code == 200
+    assert _token_key(auth_headers) in auth._verified_tokens
+
+    # Served from the token cache; fails if flask_jwt_extended stops seeing the token on g
+    assert _get_users(client, auth_headers).status_code == 200
+
+
+def test_logout_revokes_the_token(client, auth_headers):
+    assert _get_users(client, auth_headers).status_code == 200
+
+    assert client.post('/api/logout', headers=auth_headers).status_code == 200
+
+    assert _get_users(client, auth_headers).status_code == 401
+
+
+def test_token_revoked_by_another_worker_is_rejected_on_cache_hit(client, auth_headers):
+    assert _get_users(client, auth_headers).status_code == 200
+    claims = auth._verified_tokens[_token_key(auth_headers)][1]
+
+    # Written by another worker; this one sees it once its revoked set is refreshed
+    db.session.add(RevokedToken(
+        jti=claims['jti'],
+        expires_at=datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+    ))
+    db.session.commit()
+    token_service._last_refresh = float('-inf')
+
+    assert _get_users(client, auth_headers).status_code == 401
+
+
+def test_expired_token_is_rejected_on_cache_hit(client, auth_headers, app_context):
+    access_token = create_access_token(identity=1, additional_claims={'u': 'alice', 'v': 0},
+                                       expires_delta=timedelta(seconds=2))
+    headers = {'Authorization': f'Bearer {access_token}'}
+    assert _get_users(client, headers).status_code == 200
+    assert _token_key(headers) in auth._verified_tokens
+
+    time.sleep(3)
+
+    assert _get_users(client, headers).status_code == 401
+
+
+def test_refresh_token_is_rejected_on_cache_hit(client, auth_headers, app_context):
+    assert _get_users(client, auth_headers).status_code == 200
+    jwt_header, jwt_data = auth._verified_tokens[_token_key(auth_headers)]
+    refresh_token = create_refresh_token(identity=1, additional_claims={'u': 'alice', 'v': 0})
+    headers = {'Authorization': f'Bearer {refresh_token}'}
+    # As if a refresh token had been cached next to the access tokens
+    auth._verified_tokens[_token_key(headers)] = (jwt_header, {**jwt_data, 'type': 'refresh'})
+
+    assert _get_users(client, headers).status_code == 401
+
+
+def test_deleted_users_token_is_rejected(client, auth_headers):
+    assert _get_users(client, auth_headers).status_code == 200
+
+    assert UserService.delete_user(1)
+
+    assert _get_users(client, auth_headers).status_code == 401
+
+
+def test_token_with_outdated_version_is_rejected(client, auth_headers):
+    assert _get_users(client, auth_headers).status_code == 200
+
+    db.session.execute(db.update(User).filter_by(id=1).values(token_version=User.token_version + 1))
+    db.session.commit()
+    UserService.invalidate_user_cache(1)
+
+    response = _get_users(client, auth_headers)
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'Token has been revoked'
+
+
+def test_login_cache_hit_returns_the_matching_user(app_context):
+    # The same characters split differently between username and password
+    UserService.create_user('alice:x', 'y')
+    UserService.create_user('alice', 'x:y')
+
+    assert UserService.login('alice:x', 'y').username == 'alice:x'
+    assert UserService.login('alice:x', 'y').username == 'alice:x'
+    assert UserService.login('alice', 'x:y').username == 'alice'
+    assert UserService.login('alice', 'y') is None
+
+
+def test_login_upgrades_legacy_pbkdf2_hash(app_context):
+    db.session.add(User(username='legacy', password=generate_password_hash('secret', method='pbkdf2:sha256')))
+    db.session.commit()
+
+    user = UserService.login('legacy', 'secret')
+
+    assert user is not None
+    stored = db.session.scalar(db.select(User.password).filter_by(username='legacy'))
+    assert stored.startswith('$argon2')
+    UserService.invalidate_user_cache(user.id)
+    assert UserService.login('legacy', 'secret') is not None
+    assert UserService.login('legacy', 'wrong') is None
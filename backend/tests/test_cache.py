@@ -0,0 +1,76 @@
+import pytest
+from flask import Flask
+from app.cache import ResponseCache, VideoCache, response_cache, video_cache
+
+pytest.importorskip('redis')
+
+# Nothing listens on port 1, so every Redis command fails to connect
+UNREACHABLE_REDIS_URL = 'redis://127.0.0.1:1/0'
+
+
+def _unreachable_redis_app():
+    app = Flask(__name__)
+    app.config['REDIS_URL'] = UNREACHABLE_REDIS_URL
+    return app
+
+
+def test_response_cache_misses_when_redis_is_down():
+    cache = ResponseCache()
+    cache.init_app(_unreachable_redis_app())
+
+    key = cache.key('videos', 'page')
+    cache.set(key, b'body')
+    cache.invalidate('videos')
+
+    assert cache.get(key) is None
+
+
+def test_video_cache_loads_from_database_when_redis_is_down():
+    cache = VideoCache()
+    cache.init_app(_unreachable_redis_app())
+
+    value = cache.get_or_set(cache.key('video', 'id:1'), lambda: {'id': 1})
+
+    assert value == {'id': 1}
+
+
+@pytest.fixture
+def unreachable_redis(app):
+    response_cache.init_app(_unreachable_redis_app())
+    video_cache.init_app(_unreachable_redis_app())
+    yield
+    response_cache.init_app(app)
+    video_cache.init_app(app)
+
+
+def test_video_routes_work_when_redis_is_down(client, auth_headers, unreachable_redis):
+    headers = auth_headers
+    client.post('/api/collections', json={'name': 'Collection', 'user_id': 1}, headers=headers)
+    video = client.post(
+        '/api/videos',
+        json={'youtube_id': 'yt-1', 'title': 'Video', 'collection_id': 1},
+        headers=headers
+    ).get_json()
+
+    for path in ('/api/videos', f'/api/videos/{video["id"]}', '/api/collections/1/videos',
+                 f'/api/videos/{video["id"]}/transcripts'):
+        response = client.get(path, headers=headers)
+        # Reading the body runs the streamed routes to completion
+        assert response.status_code == 200 and response.get_json() is not None, path
+
+
+def test_deleting_a_collection_evicts_its_cached_videos(client, auth_headers):
+    headers = auth_headers
+    client.post('/api/collections', json={'name': 'Collection', 'user_id': 1}, headers=headers)
+    video = client.post(
+        '/api/videos',
+        json={'youtube_id': 'yt-1', 'title': 'Video', 'collection_id': 1},
+        headers=headers
+    ).get_json()
+    assert client.get(f'/api/videos/{video["id"]}', headers=headers).status_code == 200
+    assert client.get('/api/videos/youtube/yt-1', headers=headers).status_code == 200
+
+    assert client.delete('/api/collections/1', headers=headers).status_code == 200
+
+    assert client.get(f'/api/videos/{video["id"]}', headers=headers).status_code == 404
+    assert client.get('/api/videos/youtube/yt-1', headers=headers).status_code == 404
@@ -0,0 +1,42 @@
+import pytest
+from app import db
+from app.models.models import Collection, Transcript, User, Video
+from app.services.transcript_service import TranscriptService
+
+# Long enough to be split into two chunks
+CONTENT = ' '.join(['word'] * 3000)
+
+
+@pytest.fixture
+def video_id(app_context):
+    user = User(username='alice', password='not-a-real-hash')
+    db.session.add(user)
+    db.session.flush()
+    collection = Collection(name='Collection', user_id=user.id)
+    db.session.add(collection)
+    db.session.flush()
+    video = Video(youtube_id='yt-1', title='Video', collection_id=collection.id)
+    db.session.add(video)
+    db.session.commit()
+    return video.id
+
+
+def test_create_transcript_writes_all_chunks_in_one_insert(video_id, query_counter):
+    with query_counter() as queries:
+        chunks = TranscriptService.create_transcript(video_id, CONTENT)
+
+    assert [chunk.chunk_index for chunk in chunks] == [0, 1]
+    inserts = [q for q in queries if q.startswith('INSERT')]
+    assert len(inserts) == 1
+    stored = dict(db.session.execute(
+        db.select(Transcript.chunk_index, Transcript.id).filter_by(video_id=video_id)
+    ).all())
+    assert {chunk.chunk_index: chunk.id for chunk in chunks} == stored
+
+
+def test_create_transcript_upserts_existing_chunks_in_place(video_id):
+    first = TranscriptService.create_transcript(video_id, CONTENT)
+    second = TranscriptService.create_transcript(video_id, CONTENT + ' more')
+
+    assert [chunk.id for chunk in second] == [chunk.id for chunk in first]
+    assert second[-1].content.endswith('more')
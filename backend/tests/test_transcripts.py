@@ -0,0 +1,24 @@
+import sqlite3
+from sqlalchemy.exc import IntegrityError
+from app.services import TranscriptService
+
+
+def test_create_transcript_for_missing_video_is_rejected(client, auth_headers):
+    response = client.post('/api/transcripts', json={'video_id': 42, 'content': 'words'}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Video with ID 42 does not exist'
+
+
+def test_create_transcript_reports_other_integrity_errors_as_such(client, auth_headers, monkeypatch):
+    def create_transcript(video_id, content):
+        raise IntegrityError(
+            'INSERT INTO transcripts ...', {},
+            sqlite3.IntegrityError('CHECK constraint failed: ck_transcripts_content_nonempty')
+        )
+    monkeypatch.setattr(TranscriptService, 'create_transcript', staticmethod(create_transcript))
+
+    response = client.post('/api/transcripts', json={'video_id': 1, 'content': 'words'}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Transcript content cannot be empty'
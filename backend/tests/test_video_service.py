@@ -0,0 +1,144 @@
+from pathlib import Path
+import pytest
+from app import db
+from app.cache import video_cache
+from app.models.models import Collection, User, Video
+from app.services import video_service
+from app.services.video_service import VideoService
+
+
+@pytest.fixture
+def collections(app_context):
+    """Three collections of three videos each, detached so nothing is loaded yet"""
+    user = User(username='alice', password='not-a-real-hash')
+    db.session.add(user)
+    db.session.flush()
+    collections = [Collection(name=f'Collection {i}', user_id=user.id) for i in range(3)]
+    db.session.add_all(collections)
+    db.session.flush()
+    for collection in collections:
+        db.session.add_all(
+            Video(youtube_id=f'yt-{collection.id}-{i}', title=f'Video {i}', collection_id=collection.id)
+            for i in range(3)
+        )
+    db.session.commit()
+    ids = [collection.id for collection in collections]
+    db.session.expunge_all()
+    return ids
+
+
+def test_get_videos_by_collection_loads_collection_in_two_queries(collections, query_counter):
+    with query_counter(budget=2):
+        videos = VideoService.get_videos_by_collection(collections[0])
+        names = {video.collection.name for video in videos}
+
+    assert len(videos) == 3
+    assert names == {'Collection 0'}
+
+
+def test_get_all_videos_eager_loads_collections(collections, query_counter):
+    with query_counter(budget=2):
+        videos = VideoService.get_all_videos()
+        names = {video.collection.name for video in videos}
+
+    assert len(videos) == 9
+    assert names == {'Collection 0', 'Collection 1', 'Collection 2'}
+
+
+def test_get_all_videos_lazy_loads_one_query_per_collection(collections, query_counter):
+    # Shows the budget above is tight enough to catch the N+1 pattern
+    with query_counter() as queries:
+        for video in VideoService.get_all_videos(eager=False):
+            video.collection.name
+
+    assert len(queries) == 1 + len(collections)
+
+
+def test_update_video_query_budget(collections, query_counter):
+    video_id = VideoService.get_videos_by_collection(collections[0])[0].id
+
+    with query_counter(budget=1):
+        updated = VideoService.update_video(video_id, title='Renamed')
+    assert updated.title == 'Renamed'
+
+    # Moving to another collection adds the (cached) existence check
+    with query_counter(budget=2):
+        updated = VideoService.update_video(video_id, collection_id=collections[1])
+    assert updated.collection_id == collections[1]
+
+
+def test_update_video_to_stale_cached_collection_raises_value_error(collections):
+    video_id = VideoService.get_videos_by_collection(collections[0])[0].id
+    missing_id = max(collections) + 1
+    # As if another worker deleted the collection after it was cached here
+    video_service._collection_exists_cache[missing_id] = True
+
+    with pytest.raises(ValueError, match=f'Collection with ID {missing_id} does not exist'):
+        VideoService.update_video(video_id, collection_id=missing_id)
+    assert missing_id not in video_service._collection_exists_cache
+
+
+def test_video_service_does_not_use_joinedload():
+    # Relationships on Video are loaded with selectinload (see DEFAULT_LOAD_OPTIONS),
+    # which avoids the row multiplication joinedload causes with collections
+    source = Path(video_service.__file__).read_text()
+    assert 'joinedload(' not in source
+
+
+def test_bulk_create_videos_uses_one_insert_and_keeps_input_order(collections, query_counter):
+    youtube_ids = ['yt-e', 'yt-a', 'yt-d', 'yt-b', 'yt-c']
+
+    with query_counter() as queries:
+        created = VideoService.bulk_create_videos(
+            collections[0],
+            [{'youtube_id': youtube_id, 'title': youtube_id} for youtube_id in youtube_ids]
+        )
+
+    assert [row.youtube_id for row in created] == youtube_ids
+    assert len([q for q in queries if q.startswith('INSERT')]) == 1
+
+
+def test_update_video_only_evicts_that_video(collections, query_counter):
+    first, second = VideoService.get_videos_by_collection(collections[0])[:2]
+    first_id, first_youtube_id = first.id, first.youtube_id
+    VideoService.get_video_by_youtube_id_cached(first_youtube_id)
+    cached = VideoService.get_video_by_id_cached(second.id)
+
+    VideoService.update_video(first_id, title='Renamed')
+
+    with query_counter(budget=0):
+        assert VideoService.get_video_by_id_cached(cached['id']) == cached
+    assert VideoService.get_video_by_id_cached(first_id)['title'] == 'Renamed'
+    assert VideoService.get_video_by_youtube_id_cached(first_youtube_id)['title'] == 'Renamed'
+
+
+def test_delete_collection_evicts_its_cached_videos(collections):
+    from app.services.collection_service import CollectionService
+    video = VideoService.get_videos_by_collection(collections[0])[0]
+    VideoService.get_video_by_id_cached(video.id)
+    VideoService.get_video_by_youtube_id_cached(video.youtube_id)
+
+    assert CollectionService.delete_collection(collections[0])
+
+    assert VideoService.get_video_by_id_cached(video.id) is None
+    assert VideoService.get_video_by_youtube_id_cached(video.youtube_id) is None
+
+
+def test_delete_user_evicts_their_cached_videos(collections):
+    from app.services.user_service import UserService
+    video = VideoService.get_videos_by_collection(collections[2])[0]
+    VideoService.get_video_by_id_cached(video.id)
+
+    assert UserService.delete_user(1)
+
+    assert VideoService.get_video_by_id_cached(video.id) is None
+
+
+def test_load_racing_with_a_write_is_not_cached(app_context):
+    key = video_cache.key('video', 'id:1')
+    video_cache.delete(key)
+
+    # A load that read the row before the write finishes after it
+    video_cache.set(key, b'{"title":"stale"}')
+
+    assert video_cache.get_or_set(key, lambda: {'title': 'fresh'}) == {'title': 'fresh'}
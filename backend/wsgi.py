@@ -0,0 +1,26 @@
+"""
+WSGI entrypoint for running under gunicorn with gevent workers:
+
+    gunicorn -k gevent --worker-connections 30 wsgi:app
+
+Keep --worker-connections at or below DB_POOL_SIZE + DB_MAX_OVERFLOW so
+concurrent greenlets never wait on the connection pool.
+"""
+# Patch blocking I/O before anything else imports socket/threading
+from gevent import monkey
+monkey.patch_all()
+
+try:
+    # Make psycopg2 cooperative when running against Postgres
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+except ImportError:
+    pass
+
+import os
+from app import create_app
+from app.config import config
+
+# Created at import time so the engine and its pool live for the worker's lifetime.
+# Production unless FLASK_ENV says otherwise; development enables DEBUG and query recording
+app = create_app(config.get(os.environ.get('FLASK_ENV', 'production')))